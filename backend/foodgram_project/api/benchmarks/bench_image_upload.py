@@ -0,0 +1,68 @@
+"""
+Benchmark of memory used for decoding base64 encoded recipe images.
+
+Run with: python manage.py test api.benchmarks.bench_image_upload
+"""
+import base64
+import os
+import tracemalloc
+from io import BytesIO
+from math import isqrt
+
+from django.test import SimpleTestCase, override_settings
+from drf_extra_fields.fields import Base64ImageField
+from PIL import Image
+
+from ..fields import StreamingBase64ImageField
+
+SIZES_MB = (1, 10, 50)
+
+
+def make_image(size):
+    """ Returns base64 encoded PNG image of about size bytes. """
+
+    side = isqrt(size // 3)
+    image = Image.frombytes('RGB', (side, side), os.urandom(side * side * 3))
+    buffer = BytesIO()
+    image.save(buffer, 'PNG', compress_level=0)
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/png;base64,{encoded}'
+
+
+def measure(field, data):
+    """ Returns peak of memory allocated by decoding of the image. """
+
+    tracemalloc.start()
+    try:
+        image = field.to_internal_value(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    image.close()
+    return peak
+
+
+@override_settings(
+    RECIPE_IMAGE_MAX_BYTES=max(SIZES_MB) * 2 * 1024 * 1024,
+    RECIPE_IMAGE_MAX_PIXELS=10 ** 9,
+)
+class ImageUploadBenchmark(SimpleTestCase):
+    """ Compare memory peaks of base64 image fields. """
+
+    def test_benchmark(self):
+        print()
+        print(f"{'size, MB':>9} {'base64, MB':>11} {'streaming, MB':>14}")
+        for size in SIZES_MB:
+            data = make_image(size * 1024 * 1024)
+            base64_peak = measure(Base64ImageField(), data)
+            streaming_peak = measure(StreamingBase64ImageField(), data)
+            self.assertLess(
+                streaming_peak,
+                base64_peak,
+                'Streaming decode uses more memory',
+            )
+            print(
+                f'{size:>9} {base64_peak / 2 ** 20:>11.1f} '
+                f'{streaming_peak / 2 ** 20:>14.1f}'
+            )
+            del data
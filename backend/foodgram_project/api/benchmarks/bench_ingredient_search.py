@@ -0,0 +1,64 @@
+"""
+Benchmark for searching of ingredients by name prefix.
+
+Run with: python manage.py test api.benchmarks.bench_ingredient_search
+"""
+import json
+import os
+from timeit import timeit
+
+from django.conf import settings
+from django.test import TestCase
+
+from recipes.models import Ingredient
+from ..indexes import IngredientPrefixIndex
+
+CATALOGUE = os.path.join(
+    settings.BASE_DIR, '..', '..', 'data', 'ingredients.json',
+)
+PREFIXES = ('а', 'мо', 'сах', 'карто', 'я', 'xyz')
+REPEATS = 200
+
+
+class IngredientSearchBenchmark(TestCase):
+    """ Compare database and in-memory index prefix search. """
+
+    @classmethod
+    def setUpTestData(cls):
+        with open(CATALOGUE, encoding='utf-8') as catalogue:
+            Ingredient.objects.bulk_create(
+                Ingredient(**ingredient) for ingredient in json.load(catalogue)
+            )
+
+    def test_benchmark(self):
+        index = IngredientPrefixIndex()
+        build = timeit(index._ensure_built, number=1)
+
+        print()
+        print(f'catalogue: {Ingredient.objects.count()} ingredients, '
+              f'index build: {build * 1000:.2f} ms')
+        print(f"{'prefix':>8} {'found':>6} {'db, us':>10} {'index, us':>10}")
+        for prefix in PREFIXES:
+            found = index.search(prefix)
+            self.assertEqual(
+                [ingredient.id for ingredient in found],
+                list(
+                    Ingredient.objects.filter(
+                        name__startswith=prefix,
+                    ).order_by('name', 'id').values_list('id', flat=True)
+                ),
+                'Different search results',
+            )
+
+            database = timeit(
+                lambda: list(
+                    Ingredient.objects.filter(name__istartswith=prefix)
+                ),
+                number=REPEATS,
+            )
+            memory = timeit(lambda: index.search(prefix), number=REPEATS)
+            print(
+                f'{prefix:>8} {len(found):>6} '
+                f'{database / REPEATS * 10 ** 6:>10.1f} '
+                f'{memory / REPEATS * 10 ** 6:>10.1f}'
+            )
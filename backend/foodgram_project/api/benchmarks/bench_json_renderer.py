@@ -0,0 +1,106 @@
+"""
+Benchmark for rendering of recipes list pages to JSON.
+
+Run with: python manage.py test api.benchmarks.bench_json_renderer
+"""
+import json
+import os
+from timeit import timeit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, IngredientRecipe, Recipe, Tag
+from ..renderers import FastJSONRenderer
+
+User = get_user_model()
+
+CATALOGUE = os.path.join(
+    settings.BASE_DIR, '..', '..', 'data', 'ingredients.json',
+)
+PAGE_SIZES = (6, 50, 100)
+INGREDIENTS_AMOUNT = 15
+REPEATS = 20
+
+
+class ASCIIJSONRenderer(JSONRenderer):
+    ensure_ascii = True
+
+
+class JSONRendererBenchmark(TestCase):
+    """ Compare DRF and fast JSON renderers on recipes pages. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            email='author@user.ru',
+            username='author',
+            first_name='Иван',
+            last_name='Петров',
+        )
+        tags = [
+            Tag.objects.create(name=name, slug=slug, color='#E26C2D')
+            for name, slug in (
+                ('Завтрак', 'breakfast'),
+                ('Обед', 'lunch'),
+                ('Ужин', 'dinner'),
+            )
+        ]
+        with open(CATALOGUE, encoding='utf-8') as catalogue:
+            ingredients = Ingredient.objects.bulk_create(
+                Ingredient(**ingredient)
+                for ingredient in json.load(catalogue)[:INGREDIENTS_AMOUNT]
+            )
+        recipes = Recipe.objects.bulk_create(
+            Recipe(
+                author=cls.user,
+                name=f'Рецепт {index}',
+                text='Смешать все ингредиенты и запекать полчаса. ' * 5,
+                image='recipes_photo/test.png',
+                cooking_time=30,
+            )
+            for index in range(max(PAGE_SIZES))
+        )
+        Recipe.tags.through.objects.bulk_create(
+            Recipe.tags.through(recipe=recipe, tag=tag)
+            for recipe in recipes
+            for tag in tags
+        )
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(recipe=recipe, ingredient=ingredient, amount=100)
+            for recipe in recipes
+            for ingredient in ingredients
+        )
+
+    def test_benchmark(self):
+        # Anonymous responses are rendered by response cache.
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        renderers = (ASCIIJSONRenderer(), JSONRenderer(), FastJSONRenderer())
+
+        print()
+        print(
+            f"{'page':>5} {'ascii, B':>9} {'utf-8, B':>9} "
+            f"{'drf, ms':>8} {'fast, ms':>9}"
+        )
+        for page_size in PAGE_SIZES:
+            data = client.get(
+                '/api/recipes/', {'limit': page_size},
+            ).data
+            ascii_content, content, fast_content = (
+                renderer.render(data) for renderer in renderers
+            )
+            self.assertEqual(content, fast_content, 'Different content')
+
+            durations = [
+                timeit(lambda: renderer.render(data), number=REPEATS)
+                / REPEATS * 1000
+                for renderer in renderers[1:]
+            ]
+            print(
+                f'{page_size:>5} {len(ascii_content):>9} {len(content):>9} '
+                f'{durations[0]:>8.3f} {durations[1]:>9.3f}'
+            )
@@ -0,0 +1,74 @@
+"""
+Benchmark for deep pages of recipes list.
+
+Run with: python manage.py test api.benchmarks.bench_recipe_pagination
+"""
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.pagination import Cursor
+
+from recipes.models import Recipe
+from ..pagination import LimitCursorPagination
+
+User = get_user_model()
+
+PAGE = 1000
+PAGE_SIZE = 6
+RECIPES_AMOUNT = (PAGE + 10) * PAGE_SIZE
+REPEATS = 20
+
+
+class RecipePaginationBenchmark(TestCase):
+    """ Compare page number and keyset pagination on deep page. """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(
+            email='author@user.ru', username='author',
+        )
+        Recipe.objects.bulk_create(
+            Recipe(
+                author=author,
+                name=f'Recipe {index}',
+                text='Text',
+                image='recipes_photo/test.png',
+                cooking_time=10,
+            )
+            for index in range(RECIPES_AMOUNT)
+        )
+
+    def _cursor_url(self):
+        """ Cursor which points to the same page as page number. """
+
+        position = Recipe.objects.order_by('-id').values_list(
+            'id', flat=True,
+        )[(PAGE - 1) * PAGE_SIZE - 1]
+        paginator = LimitCursorPagination()
+        paginator.base_url = f"{reverse('recipe-list')}?limit={PAGE_SIZE}"
+        return paginator.encode_cursor(Cursor(0, False, str(position)))
+
+    def _measure(self, url):
+        response = self.client.get(url)
+        start = perf_counter()
+        for _ in range(REPEATS):
+            self.client.get(url)
+        return response, (perf_counter() - start) / REPEATS
+
+    def test_benchmark(self):
+        page_url = f"{reverse('recipe-list')}?limit={PAGE_SIZE}&page={PAGE}"
+        page_response, page_duration = self._measure(page_url)
+        cursor_response, cursor_duration = self._measure(self._cursor_url())
+
+        self.assertEqual(
+            page_response.json()['results'],
+            cursor_response.json()['results'],
+            'Different pages',
+        )
+
+        print()
+        print(f'{RECIPES_AMOUNT} recipes, page {PAGE} of {PAGE_SIZE} items')
+        print(f'page number: {page_duration * 1000:.2f} ms')
+        print(f'cursor:      {cursor_duration * 1000:.2f} ms')
@@ -0,0 +1,96 @@
+"""
+Benchmark for presentation of recipes list page.
+
+Run with: python manage.py test api.benchmarks.bench_recipe_serializers
+"""
+from timeit import timeit
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from recipes.models import Ingredient, IngredientRecipe, Recipe, Tag
+from users.serializers import SUBSCRIBED_AUTHORS
+from ..serializers import FastRecipeSerializer, RecipeSerializer
+
+User = get_user_model()
+
+PAGE_SIZE = 100
+INGREDIENTS_AMOUNT = 15
+REPEATS = 10
+
+
+class RecipeSerializersBenchmark(TestCase):
+    """ Compare DRF serializer and fast presentation of recipes. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            email='author@user.ru', username='author',
+        )
+        tags = [
+            Tag.objects.create(name=f'Tag {index}', slug=f'tag{index}')
+            for index in range(3)
+        ]
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f'Ingredient {index}', measurement_unit='g')
+            for index in range(INGREDIENTS_AMOUNT)
+        )
+        recipes = Recipe.objects.bulk_create(
+            Recipe(
+                author=cls.user,
+                name=f'Recipe {index}',
+                text='Text',
+                image='recipes_photo/test.png',
+                cooking_time=10,
+            )
+            for index in range(PAGE_SIZE)
+        )
+        Recipe.tags.through.objects.bulk_create(
+            Recipe.tags.through(recipe=recipe, tag=tag)
+            for recipe in recipes
+            for tag in tags
+        )
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(recipe=recipe, ingredient=ingredient, amount=1)
+            for recipe in recipes
+            for ingredient in ingredients
+        )
+
+    def test_benchmark(self):
+        recipes = list(
+            Recipe.objects.with_related().with_user_flags(self.user)
+        )
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = self.user
+        context = {'request': request, SUBSCRIBED_AUTHORS: set()}
+
+        print()
+        print(
+            f'{PAGE_SIZE} recipes with {INGREDIENTS_AMOUNT} ingredients, '
+            f'ms per page'
+        )
+        results = {}
+        for serializer_class in (RecipeSerializer, FastRecipeSerializer):
+            serializer = serializer_class(context=context)
+            results[serializer_class] = [
+                serializer.to_representation(recipe) for recipe in recipes
+            ]
+            duration = timeit(
+                lambda: [
+                    serializer.to_representation(recipe)
+                    for recipe in recipes
+                ],
+                number=REPEATS,
+            )
+            print(
+                f'{serializer_class.__name__:>22} '
+                f'{duration / REPEATS * 1000:>8.2f}'
+            )
+
+        self.assertEqual(
+            results[RecipeSerializer],
+            results[FastRecipeSerializer],
+            'Different presentations',
+        )
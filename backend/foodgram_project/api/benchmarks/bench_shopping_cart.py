@@ -0,0 +1,125 @@
+"""
+Benchmark for forming of shopping list.
+
+Run with: python manage.py test api.benchmarks.bench_shopping_cart
+"""
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from recipes.models import (
+    Ingredient, IngredientRecipe, Recipe, ShoppingCart,
+)
+
+User = get_user_model()
+
+CART_SIZES = (10, 100, 1000)
+INGREDIENTS_PER_RECIPE = 10
+
+
+def legacy_shopping_list(user):
+    """ Shopping list forming with python loops over cart objects. """
+
+    need_to_buy = dict()
+
+    for cart_object in ShoppingCart.objects.filter(user=user):
+        ingredient_queryset = cart_object.recipe.ingredients_list.all()
+        for ingredient in ingredient_queryset:
+            if ingredient.ingredient.name not in need_to_buy:
+                need_to_buy[ingredient.ingredient.name] = {
+                    'measurement_unit':
+                    ingredient.ingredient.measurement_unit,
+                    'amount': 0,
+                }
+            need_to_buy[ingredient.ingredient.name]['amount'] += (
+                ingredient.amount
+            )
+    return need_to_buy
+
+
+def aggregated_shopping_list(user):
+    """ Shopping list forming with database aggregation. """
+
+    return list(IngredientRecipe.objects.shopping_list(user))
+
+
+class ShoppingCartBenchmark(TestCase):
+    """ Compare legacy and aggregated shopping list forming. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f'Ingredient {index}', measurement_unit='g')
+            for index in range(100)
+        )
+        cls.author = User.objects.create(
+            email='author@user.ru', username='author',
+        )
+        cls.recipes = Recipe.objects.bulk_create(
+            Recipe(
+                author=cls.author,
+                name=f'Recipe {index}',
+                text='Text',
+                image='recipes_photo/test.png',
+                cooking_time=10,
+            )
+            for index in range(max(CART_SIZES))
+        )
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(
+                recipe=recipe,
+                ingredient=cls.ingredients[
+                    (recipe_index + index) % len(cls.ingredients)
+                ],
+                amount=index + 1,
+            )
+            for recipe_index, recipe in enumerate(cls.recipes)
+            for index in range(INGREDIENTS_PER_RECIPE)
+        )
+
+    def _measure(self, function, user):
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            start = perf_counter()
+            function(user)
+            duration = perf_counter() - start
+        return duration, len(queries)
+
+    def test_benchmark(self):
+        print()
+        print(f"{'cart':>6} {'path':>10} {'queries':>8} {'ms':>10}")
+        for size in CART_SIZES:
+            user = User.objects.create(
+                email=f'user{size}@user.ru', username=f'user{size}',
+            )
+            ShoppingCart.objects.bulk_create(
+                ShoppingCart(user=user, recipe=recipe)
+                for recipe in self.recipes[:size]
+            )
+
+            legacy = {
+                name: value['amount']
+                for name, value in legacy_shopping_list(user).items()
+            }
+            aggregated = {
+                row['name']: row['amount']
+                for row in aggregated_shopping_list(user)
+            }
+            self.assertEqual(legacy, aggregated, 'Different shopping lists')
+
+            for path, function in (
+                ('legacy', legacy_shopping_list),
+                ('aggregate', aggregated_shopping_list),
+            ):
+                duration, queries = self._measure(function, user)
+                print(
+                    f'{size:>6} {path:>10} {queries:>8} '
+                    f'{duration * 1000:>10.2f}'
+                )
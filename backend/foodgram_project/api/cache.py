@@ -0,0 +1,242 @@
+import hashlib
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+
+VERSION_KEY = 'version:{namespace}'
+METRIC_KEY = 'metric:{name}'
+
+
+def get_version(namespace):
+    """
+    Get current version of cached namespace.
+    Version is a time of last change in nanoseconds.
+    """
+
+    key = VERSION_KEY.format(namespace=namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        return cache.get(key)
+    return version
+
+
+def get_versions(namespaces):
+    """ Get current versions of several namespaces in one cache request. """
+
+    keys = {
+        VERSION_KEY.format(namespace=namespace): namespace
+        for namespace in namespaces
+    }
+    versions = {
+        keys[key]: version for key, version in cache.get_many(keys).items()
+    }
+    for namespace in set(namespaces) - set(versions):
+        versions[namespace] = get_version(namespace)
+    return versions
+
+
+def _set_version(namespace):
+    cache.set(
+        VERSION_KEY.format(namespace=namespace), time.time_ns(), timeout=None,
+    )
+
+
+def bump_version(namespace):
+    """
+    Invalidate all cached data of namespace.
+    Inside transaction version is bumped after commit, otherwise
+    concurrent request could cache old data under the new version.
+    """
+
+    transaction.on_commit(partial(_set_version, namespace))
+
+
+def get_query_key(request, exclude=()):
+    """ Normalized query string of request without excluded params. """
+
+    return '&'.join(
+        f'{name}={value}'
+        for name, values in sorted(request.query_params.lists())
+        if name not in exclude
+        for value in sorted(values)
+    )
+
+
+def hash_key(value):
+    """
+    Hash of url for cache key, so keys have fixed length and contain no
+    characters which are not allowed by memcached.
+    """
+
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def get_cache_key(namespace, version, request):
+    url = f'{request.path}?{get_query_key(request)}'
+    return f'{namespace}:{version}:{hash_key(url)}'
+
+
+def increment_counter(name):
+    """ Increment metric counter stored in cache. """
+
+    key = METRIC_KEY.format(name=name)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def get_counter(name):
+    return cache.get(METRIC_KEY.format(name=name), 0)
+
+
+class CachedReferenceMixin:
+    """
+    Mixin for read only viewsets with rarely changed data.
+    JSON responses are cached as rendered bytes with ETag and
+    Last-Modified headers, conditional requests get 304 response.
+    Last-Modified is sent only when the last change is older than
+    a couple of seconds.
+    Cache is invalidated by bumping version of `cache_namespace`.
+    """
+
+    cache_namespace = None
+
+    def _cached_response(self, request, get_response):
+        if request.accepted_renderer.format != 'json':
+            return get_response()
+
+        version = get_version(self.cache_namespace)
+        key = get_cache_key(self.cache_namespace, version, request)
+        entry = cache.get(key)
+
+        if entry is None:
+            response = get_response()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            content = request.accepted_renderer.render(response.data)
+            entry = (f'"{hashlib.md5(content).hexdigest()}"', content)
+            cache.set(key, entry, settings.REFERENCE_CACHE_TIMEOUT)
+
+        etag, content = entry
+        # Last-Modified has precision of seconds, so it's used only after
+        # the second of the change has passed, otherwise next change in
+        # the same second would get the same date. Extra second covers
+        # clock difference between servers.
+        last_modified = version // 10 ** 9
+        if last_modified >= time.time_ns() // 10 ** 9 - 1:
+            last_modified = None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified,
+        )
+        if response is None:
+            response = HttpResponse(content, content_type='application/json')
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(
+            request, partial(super().list, request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(
+            request, partial(super().retrieve, request, *args, **kwargs),
+        )
+
+
+class AnonymousResponseCacheMixin:
+    """
+    Mixin for viewsets which caches JSON responses of list and retrieve
+    for anonymous users.
+    Key of response contains versions of `get_response_key_namespaces`
+    and only query params from `response_cache_params`. Entry keeps
+    versions of `get_response_namespaces` for response data and it is
+    used while they are not bumped, so every object has its own version.
+    Hits and misses are counted as `response_cache:{name}:hit|miss`.
+    """
+
+    response_cache_name = None
+    response_cache_params = ()
+
+    def get_response_key_namespaces(self):
+        return []
+
+    def get_response_namespaces(self, data):
+        raise NotImplementedError
+
+    def _get_response_key(self, request):
+        namespaces = self.get_response_key_namespaces()
+        versions = get_versions(namespaces)
+        query_key = get_query_key(
+            request,
+            exclude=set(request.query_params) - set(
+                self.response_cache_params,
+            ),
+        )
+        # Urls of images and pages are absolute.
+        url = f'{request.build_absolute_uri(request.path)}?{query_key}'
+        return ':'.join((
+            'response',
+            *(str(versions[namespace]) for namespace in namespaces),
+            hash_key(url),
+        ))
+
+    def _cached_response(self, request, get_response):
+        if (
+            request.user.is_authenticated
+            or request.accepted_renderer.format != 'json'
+        ):
+            return get_response()
+
+        metric = f'response_cache:{self.response_cache_name}'
+        key = self._get_response_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            versions, content = entry
+            if get_versions(versions) == versions:
+                increment_counter(f'{metric}:hit')
+                response = HttpResponse(
+                    content, content_type='application/json',
+                )
+                response['X-Cache'] = 'HIT'
+                return response
+
+        increment_counter(f'{metric}:miss')
+        response = get_response()
+        if response.status_code != status.HTTP_200_OK:
+            return response
+
+        versions = get_versions(self.get_response_namespaces(response.data))
+        content = request.accepted_renderer.render(
+            response.data,
+            request.accepted_media_type,
+            self.get_renderer_context(),
+        )
+        cache.set(
+            key, (versions, content), settings.RESPONSE_CACHE_TIMEOUT,
+        )
+        response = HttpResponse(content, content_type='application/json')
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(
+            request, partial(super().list, request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(
+            request, partial(super().retrieve, request, *args, **kwargs),
+        )
@@ -0,0 +1,216 @@
+import base64
+import binascii
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image
+from rest_framework import serializers
+
+from recipes.renditions import get_storage
+
+# Length of base64 chunk decoded at once.
+BASE64_CHUNK_SIZE = 256 * 1024
+# Image header is looked for in this amount of decoded data.
+HEADER_MAX_SIZE = 1024 * 1024
+# Decoded image is kept in memory up to this size, then in temporary file.
+SPOOL_MAX_SIZE = 1024 * 1024
+
+IMAGE_FORMATS = {
+    'JPEG': ('jpg', 'image/jpeg'),
+    'PNG': ('png', 'image/png'),
+    'GIF': ('gif', 'image/gif'),
+    'WEBP': ('webp', 'image/webp'),
+}
+
+
+def iter_base64_chunks(data, start=0):
+    """
+    Split base64 string into chunks which can be decoded separately.
+    Whitespace of line wrapped base64 is skipped, length of every chunk
+    but the last one is multiple of 4.
+    """
+
+    rest = ''
+    for offset in range(start, len(data), BASE64_CHUNK_SIZE):
+        chunk = rest + ''.join(
+            data[offset:offset + BASE64_CHUNK_SIZE].split()
+        )
+        end = len(chunk) - len(chunk) % 4
+        rest = chunk[end:]
+        if end:
+            yield chunk[:end]
+    if rest:
+        yield rest
+
+
+def get_image_sizes(renditions, request=None):
+    """ Map of image size to urls of rendition files by format. """
+
+    storage = get_storage()
+    sizes = {}
+    for size, files in renditions.items():
+        sizes[size] = {}
+        for image_format, name in files.items():
+            url = storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            sizes[size][image_format] = url
+    return sizes
+
+
+class StreamingBase64ImageField(serializers.ImageField):
+    """
+    Image field for base64 encoded string with optional data url header
+    or for uploaded file of multipart request.
+    String is decoded by chunks into spooled temporary file, dimensions
+    are validated from image header as soon as it is decoded, and the
+    whole image is verified after decoding.
+    """
+
+    default_error_messages = {
+        'invalid_image': 'Upload a valid image.',
+        'max_bytes': 'Image size must be at most {max_bytes} bytes.',
+        'max_pixels': 'Image must have at most {max_pixels} pixels.',
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, UploadedFile):
+            return self._uploaded_file(data)
+        if not isinstance(data, str):
+            self.fail('invalid_image')
+
+        start = 0
+        if data.startswith('data:'):
+            start = data.find(',') + 1
+            if not start:
+                self.fail('invalid_image')
+
+        max_bytes = settings.RECIPE_IMAGE_MAX_BYTES
+        # Decoded size is 3/4 of base64 length without padding.
+        if (len(data) - start) // 4 * 3 - 2 > max_bytes:
+            self.fail('max_bytes', max_bytes=max_bytes)
+
+        file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        try:
+            size = self._decode(data, start, file)
+            extension, content_type = self._validate_image(file)
+        except Exception:
+            file.close()
+            raise
+
+        return UploadedFile(
+            file=file,
+            name=f'{uuid.uuid4()}.{extension}',
+            content_type=content_type,
+            size=size,
+        )
+
+    def _uploaded_file(self, file):
+        """
+        Validate file streamed to memory or temporary file by Django
+        upload handlers.
+        """
+
+        max_bytes = settings.RECIPE_IMAGE_MAX_BYTES
+        if file.size > max_bytes:
+            self.fail('max_bytes', max_bytes=max_bytes)
+        if not file.size:
+            self.fail('invalid_image')
+
+        extension, content_type = self._validate_image(file)
+        file.name = f'{uuid.uuid4()}.{extension}'
+        file.content_type = content_type
+        return file
+
+    def _decode(self, data, start, file):
+        """
+        Write decoded data to file and return size of it.
+        Dimensions are checked as soon as image header is decoded.
+        """
+
+        size = 0
+        header_checked = False
+        for chunk in iter_base64_chunks(data, start):
+            try:
+                size += file.write(base64.b64decode(chunk, validate=True))
+            except (binascii.Error, ValueError):
+                self.fail('invalid_image')
+            if not header_checked:
+                header_checked = (
+                    self._check_header(file) or size >= HEADER_MAX_SIZE
+                )
+        if not size:
+            self.fail('invalid_image')
+        return size
+
+    def _check_image(self, image):
+        """ Check format and dimensions of opened image. """
+
+        if image.format not in IMAGE_FORMATS:
+            self.fail('invalid_image')
+        width, height = image.size
+        if width * height > settings.RECIPE_IMAGE_MAX_PIXELS:
+            self._fail_max_pixels()
+
+    def _fail_max_pixels(self):
+        self.fail('max_pixels', max_pixels=settings.RECIPE_IMAGE_MAX_PIXELS)
+
+    def _check_header(self, file):
+        """
+        Check image in partially decoded file.
+        Returns False if the header is not decoded yet.
+        """
+
+        position = file.tell()
+        try:
+            file.seek(0)
+            with Image.open(file) as image:
+                self._check_image(image)
+        except serializers.ValidationError:
+            raise
+        except Image.DecompressionBombError:
+            self._fail_max_pixels()
+        except Exception:
+            return False
+        finally:
+            file.seek(position)
+        return True
+
+    def _validate_image(self, file):
+        """
+        Check image dimensions from header and verify the whole image.
+        Returns extension and content type of the image.
+        """
+
+        try:
+            file.seek(0)
+            # Only header is read by opening.
+            with Image.open(file) as image:
+                self._check_image(image)
+                image.verify()
+                image_format = image.format
+        except serializers.ValidationError:
+            raise
+        except Image.DecompressionBombError:
+            self._fail_max_pixels()
+        except Exception:
+            self.fail('invalid_image')
+        finally:
+            file.seek(0)
+        return IMAGE_FORMATS[image_format]
+
+
+class ImageSizesField(serializers.ReadOnlyField):
+    """
+    Map of image size to urls of rendition files by format.
+    Urls are absolute if request is in context like urls of image fields.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'image_renditions')
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return get_image_sizes(value, self.context.get('request'))
@@ -1,7 +1,10 @@
+from django.conf import settings
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
-from rest_framework.filters import SearchFilter
+from rest_framework.filters import OrderingFilter, SearchFilter
 
-from recipes.models import Recipe, Tag
+from recipes.models import Recipe, Tag, TagRecipe
+from .indexes import ingredient_prefix_index
 
 
 class RecipeFilter(filters.FilterSet):
@@ -11,28 +14,79 @@ class RecipeFilter(filters.FilterSet):
         queryset=Tag.objects.all(),
         field_name='tags__slug',
         to_field_name='slug',
+        method='get_tags',
     )
     is_favorited = filters.BooleanFilter(method='get_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(
         method='get_is_in_shopping_cart',
     )
+    search = filters.CharFilter(method='get_search')
+
+    def get_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(
+            Exists(
+                TagRecipe.objects.filter(recipe=OuterRef('pk'), tag__in=value)
+            )
+        )
 
     def get_is_favorited(self, queryset, name, value):
         if value:
-            return queryset.filter(favorite__user=self.request.user)
+            return queryset.filter(is_favorited=True)
         return queryset
 
     def get_is_in_shopping_cart(self, queryset, name, value):
         if value:
-            return queryset.filter(shoping_list__user=self.request.user)
+            return queryset.filter(is_in_shopping_cart=True)
         return queryset
 
+    def get_search(self, queryset, name, value):
+        return queryset.search(value)
+
     class Meta:
         model = Recipe
-        fields = ('tags', 'author', 'is_favorited', 'is_in_shopping_cart',)
+        fields = (
+            'tags', 'author', 'is_favorited', 'is_in_shopping_cart', 'search',
+        )
 
 
 class IngredientSearchFilter(SearchFilter):
-    """ Search filter with searching param is name. """
+    """
+    Search filter with searching param is name.
+    Single prefix of list is searched with in-memory index when it's
+    enabled, index returns list which can't be used to get object.
+    """
 
     search_param = 'name'
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if (
+            settings.INGREDIENT_PREFIX_INDEX
+            and getattr(view, 'action', None) == 'list'
+            and len(search_terms) == 1
+        ):
+            return ingredient_prefix_index.search(search_terms[0])
+        return super().filter_queryset(request, queryset, view)
+
+
+class RecipeOrderingFilter(OrderingFilter):
+    """
+    Ordering filter which is applied only with ordering param, so ordering
+    of filtered queryset (e.g. by search rank) is kept without it.
+    Objects with equal values are ordered by id.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return list(queryset.model._meta.ordering)
+        if '-id' not in ordering:
+            return [*ordering, '-id']
+        return ordering
+
+    def filter_queryset(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param):
+            return queryset
+        return super().filter_queryset(request, queryset, view)
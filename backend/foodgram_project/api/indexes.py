@@ -0,0 +1,75 @@
+import time
+from bisect import bisect_left
+from threading import Lock
+
+from django.conf import settings
+
+from recipes.models import Ingredient
+
+from .cache import get_version
+from .signals import INGREDIENTS_NAMESPACE
+
+
+class IngredientPrefixIndex:
+    """
+    In-memory index for case insensitive search of ingredients by name prefix.
+    Index is a sorted array of lowercased names, it is built lazily on first
+    search and rebuilt after ingredients cache version is changed.
+    Version is seen by other processes only with shared cache backend,
+    so index is also rebuilt after REFERENCE_CACHE_TIMEOUT like cached
+    responses of ingredients expire.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._version = None
+        self._expires = 0
+        # Keys and ingredients are replaced together, search reads them
+        # without lock.
+        self._index = ([], [])
+
+    def _build(self, version):
+        ingredients = sorted(
+            (
+                Ingredient(id=pk, name=name, measurement_unit=unit)
+                for pk, name, unit in Ingredient.objects.values_list(
+                    'id', 'name', 'measurement_unit',
+                ).iterator()
+            ),
+            key=lambda ingredient: (ingredient.name.lower(), ingredient.id),
+        )
+        self._index = (
+            [ingredient.name.lower() for ingredient in ingredients],
+            ingredients,
+        )
+        self._version = version
+        self._expires = time.monotonic() + settings.REFERENCE_CACHE_TIMEOUT
+
+    def _ensure_built(self):
+        version = get_version(INGREDIENTS_NAMESPACE)
+        if self._is_stale(version):
+            with self._lock:
+                if self._is_stale(version):
+                    self._build(version)
+
+    def _is_stale(self, version):
+        return self._version != version or time.monotonic() >= self._expires
+
+    def search(self, prefix):
+        """ Get ingredients with name starting with prefix ordered by name. """
+
+        self._ensure_built()
+        prefix = prefix.lower()
+        keys, ingredients = self._index
+
+        found = []
+        index = bisect_left(keys, prefix)
+        while index < len(keys) and keys[index].startswith(prefix):
+            found.append(ingredients[index])
+            index += 1
+        return sorted(
+            found, key=lambda ingredient: (ingredient.name, ingredient.id),
+        )
+
+
+ingredient_prefix_index = IngredientPrefixIndex()
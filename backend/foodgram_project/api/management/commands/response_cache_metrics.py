@@ -0,0 +1,54 @@
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from api.cache import METRIC_KEY, get_counter
+
+
+# Cache backends which don't share data between processes.
+PROCESS_CACHES = (LocMemCache, DummyCache)
+
+
+class Command(BaseCommand):
+    help = (
+        'Show hits and misses of cached responses. Counters are stored in '
+        'default cache, so they are seen only with shared cache backend.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names',
+            nargs='*',
+            default=['recipes'],
+            help='Names of cached viewsets.',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset counters after showing.',
+        )
+
+    def handle(self, *args, **options):
+        backend = caches[DEFAULT_CACHE_ALIAS]
+        if isinstance(backend, PROCESS_CACHES):
+            self.stderr.write(self.style.WARNING(
+                f'{type(backend).__name__} is not shared between processes, '
+                f'counters of web workers are not available, configure '
+                f'CACHE_BACKEND and CACHE_LOCATION settings.'
+            ))
+        for name in options['names']:
+            metric = f'response_cache:{name}'
+            hits = get_counter(f'{metric}:hit')
+            misses = get_counter(f'{metric}:miss')
+            total = hits + misses
+            ratio = hits / total * 100 if total else 0
+            self.stdout.write(
+                f'{name}: {hits} hits, {misses} misses, '
+                f'{ratio:.1f}% hit ratio'
+            )
+            if options['reset']:
+                cache.delete_many([
+                    METRIC_KEY.format(name=f'{metric}:{result}')
+                    for result in ('hit', 'miss')
+                ])
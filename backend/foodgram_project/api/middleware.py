@@ -0,0 +1,157 @@
+"""
+Compression of responses with brotli or gzip.
+
+Encoding is negotiated with Accept-Encoding header, brotli is used only
+if the package is installed. Small responses and responses of already
+compressed media types are sent as is. Streaming responses like
+downloaded shopping lists are compressed chunk by chunk, compressor
+buffers small chunks, so compression ratio doesn't depend on their size.
+"""
+
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Media types which are already compressed.
+INCOMPRESSIBLE_TYPES = (
+    'image/',
+    'audio/',
+    'video/',
+    'font/woff',
+    'application/zip',
+    'application/gzip',
+    'application/x-gzip',
+    'application/x-brotli',
+    'application/octet-stream',
+)
+
+
+class GzipCompressor:
+    encoding = 'gzip'
+
+    def __init__(self):
+        # Gzip header is written by zlib with zero mtime.
+        self._compressor = zlib.compressobj(
+            settings.COMPRESSION_GZIP_LEVEL,
+            zlib.DEFLATED,
+            16 + zlib.MAX_WBITS,
+        )
+
+    def process(self, data):
+        return self._compressor.compress(data)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    encoding = 'br'
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(
+            mode=brotli.MODE_TEXT, quality=settings.COMPRESSION_BROTLI_QUALITY,
+        )
+
+    def process(self, data):
+        return self._compressor.process(data)
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def get_compressors():
+    """ Available compressors in order of preference. """
+
+    if brotli is None:
+        return (GzipCompressor,)
+    return (BrotliCompressor, GzipCompressor)
+
+
+def parse_accept_encoding(header):
+    """ Returns encodings accepted by client with nonzero quality. """
+
+    accepted = set()
+    for item in header.split(','):
+        encoding, _, params = item.partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(encoding.strip().lower())
+    return accepted
+
+
+def is_compressible(response):
+    content_type = response.get('Content-Type', '').lower()
+    return not content_type.startswith(INCOMPRESSIBLE_TYPES)
+
+
+def compress_sequence(compressor, sequence):
+    for chunk in sequence:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with the best encoding accepted by client.
+    Responses shorter than COMPRESSION_MIN_SIZE are not compressed.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and (
+            len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+        if not is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        accepted = parse_accept_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''),
+        )
+        compressor_class = next(
+            (
+                compressor_class for compressor_class in get_compressors()
+                if compressor_class.encoding in accepted
+            ),
+            None,
+        )
+        if compressor_class is None:
+            return response
+
+        compressor = compressor_class()
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                compressor, response.streaming_content,
+            )
+            del response['Content-Length']
+        else:
+            content = compressor.process(response.content)
+            content += compressor.finish()
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        # Compressed content is not byte for byte equal to original one.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = compressor_class.encoding
+        return response
@@ -1,7 +1,118 @@
-from rest_framework.pagination import PageNumberPagination
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+from .cache import get_query_key, get_version, hash_key
+
+ESTIMATE_COUNT_SQL = (
+    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+)
+
+
+def estimate_count(queryset):
+    """ Estimated amount of rows in table of queryset on PostgreSQL. """
+
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(ESTIMATE_COUNT_SQL, [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    if row is None or row[0] < settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD:
+        return None
+    return row[0]
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator which caches count of objects by `count_key`.
+    With `estimate` count of unfiltered queryset is taken from
+    PostgreSQL statistics for big tables.
+    """
+
+    def __init__(self, *args, count_key=None, estimate=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_key = count_key
+        self.estimate = estimate
+
+    @cached_property
+    def count(self):
+        if self.estimate:
+            count = estimate_count(self.object_list)
+            if count is not None:
+                return count
+
+        if self.count_key is None:
+            return super().count
+
+        count = cache.get(self.count_key)
+        if count is None:
+            count = super().count
+            cache.set(
+                self.count_key, count, settings.PAGINATION_COUNT_TIMEOUT,
+            )
+        return count
 
 
 class LimitPageNumberPagination(PageNumberPagination):
-    """ Custom page pagination with client limit. """
+    """
+    Custom page pagination with client limit.
+    Count is cached when view defines `get_count_cache_namespaces`,
+    cache key contains versions of the namespaces, path, user and filters.
+    """
+
+    page_size_query_param = 'limit'
+
+    def get_count_key(self, request, view):
+        get_namespaces = getattr(view, 'get_count_cache_namespaces', None)
+        if get_namespaces is None:
+            return None
+
+        versions = ':'.join(
+            f'{namespace}={get_version(namespace)}'
+            for namespace in get_namespaces()
+        )
+        query = get_query_key(
+            request,
+            exclude=(self.page_query_param, self.page_size_query_param),
+        )
+        url = f'{request.path}?{query}'
+        return f'count:{versions}:{request.user.id}:{hash_key(url)}'
 
+    def use_estimate(self, request, view):
+        filters = set(request.query_params) - {
+            self.page_query_param, self.page_size_query_param,
+        }
+        return (
+            settings.PAGINATION_COUNT_ESTIMATE
+            and getattr(view, 'count_estimate', False)
+            and not filters
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = partial(
+            CachedCountPaginator,
+            count_key=self.get_count_key(request, view),
+            estimate=self.use_estimate(request, view),
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+
+class LimitCursorPagination(CursorPagination):
+    """
+    Keyset pagination with client limit and opaque cursors.
+    Pages are ordered by `-id` and don't contain total count.
+    Ordering param of view is ignored, cursors can't be built from
+    changing and not unique fields.
+    """
+
+    ordering = '-id'
     page_size_query_param = 'limit'
+
+    def get_ordering(self, request, queryset, view):
+        return (self.ordering,)
@@ -0,0 +1,273 @@
+"""
+Minimal streaming PDF writer for text documents.
+
+Text is encoded with the cp1251 code page mapped on Adobe glyph names.
+TrueType font is embedded in the document if its path is given. Otherwise
+the standard Helvetica font is used, it isn't embedded and Cyrillic
+letters are shown only by viewers which substitute it with a font having
+them. Lines longer than the page width are wrapped.
+"""
+
+import zlib
+from functools import lru_cache
+
+from PIL import ImageFont
+
+ENCODING = 'cp1251'
+
+GLYPH_DIFFERENCES = (
+    (0xA8, ['afii10023']),
+    (0xB8, ['afii10071', 'afii61352']),
+    (0xC0, [f'afii{code}' for code in range(10017, 10050) if code != 10023]),
+    (0xE0, [f'afii{code}' for code in range(10065, 10098) if code != 10071]),
+)
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 50
+FONT_SIZE = 11
+TITLE_FONT_SIZE = 16
+LEADING = 16
+LINES_PER_PAGE = (PAGE_HEIGHT - 2 * MARGIN) // LEADING
+TEXT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+
+# Glyph widths are measured in thousandths of font size.
+UNITS_PER_EM = 1000
+FIRST_CHAR, LAST_CHAR = 32, 255
+# Helvetica metrics of Cyrillic letters are unknown, wide average is used.
+DEFAULT_WIDTH = 650
+
+CATALOG, PAGES, FONT, FONT_ENCODING = 1, 2, 3, 4
+
+
+def _encode(text):
+    return text.encode(ENCODING, errors='replace')
+
+
+def _escape(text):
+    """ Encode text as PDF literal string. """
+
+    data = _encode(text)
+    return (
+        data.replace(b'\\', b'\\\\')
+        .replace(b'(', b'\\(')
+        .replace(b')', b'\\)')
+    )
+
+
+class TrueTypeFont:
+    """ TrueType font file with metrics of the code page glyphs. """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            data = file.read()
+        self.length = len(data)
+        self.data = zlib.compress(data)
+
+        font = ImageFont.truetype(path, UNITS_PER_EM)
+        self.name = ''.join(font.getname()[0].split())
+        self.ascent, self.descent = font.getmetrics()
+        self.widths = []
+        boxes = []
+        for code in range(FIRST_CHAR, LAST_CHAR + 1):
+            char = bytes([code]).decode(ENCODING, errors='replace')
+            self.widths.append(round(font.getlength(char)))
+            boxes.append(font.getbbox(char, anchor='ls'))
+        # Pillow boxes are measured downwards from baseline.
+        self.bbox = (
+            min(box[0] for box in boxes),
+            -max(box[3] for box in boxes),
+            max(box[2] for box in boxes),
+            -min(box[1] for box in boxes),
+        )
+
+
+@lru_cache(maxsize=None)
+def get_font(path):
+    """ Font is read once per process. """
+
+    return TrueTypeFont(path)
+
+
+class PDFWriter:
+    """ Writer which yields PDF document page by page. """
+
+    def __init__(self, title='', font_path=None):
+        self.title = title
+        self.font = get_font(font_path) if font_path else None
+        if self.font:
+            self.widths = self.font.widths
+        else:
+            self.widths = [DEFAULT_WIDTH] * (LAST_CHAR - FIRST_CHAR + 1)
+        self.offset = 0
+        self.offsets = {}
+        self.pages = []
+        self.next_object = FONT_ENCODING + 1
+
+    def _object(self, number, body):
+        self.offsets[number] = self.offset
+        data = b'%d 0 obj\n' % number + body + b'\nendobj\n'
+        self.offset += len(data)
+        return data
+
+    def _stream_object(self, number, content, params=b''):
+        return self._object(
+            number,
+            b'<< /Length %d' % len(content) + params + b' >>\nstream\n'
+            + content
+            + b'\nendstream',
+        )
+
+    def _header(self):
+        data = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+        self.offset += len(data)
+        differences = b' '.join(
+            b'%d ' % code + b' '.join(b'/' + name.encode() for name in names)
+            for code, names in GLYPH_DIFFERENCES
+        )
+        return b''.join((
+            data,
+            self._object(
+                CATALOG,
+                b'<< /Type /Catalog /Pages %d 0 R >>' % PAGES,
+            ),
+            self._font(),
+            self._object(
+                FONT_ENCODING,
+                b'<< /Type /Encoding /BaseEncoding /WinAnsiEncoding '
+                b'/Differences [' + differences + b'] >>',
+            ),
+        ))
+
+    def _font(self):
+        if self.font is None:
+            return self._object(
+                FONT,
+                b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica '
+                b'/Encoding %d 0 R >>' % FONT_ENCODING,
+            )
+
+        font = self.font
+        name = font.name.encode('ascii', errors='ignore')
+        descriptor, font_file = self.next_object, self.next_object + 1
+        self.next_object += 2
+        widths = b' '.join(b'%d' % width for width in font.widths)
+        return b''.join((
+            self._object(
+                FONT,
+                b'<< /Type /Font /Subtype /TrueType /BaseFont /' + name
+                + b' /FirstChar %d /LastChar %d /Widths [' % (
+                    FIRST_CHAR, LAST_CHAR,
+                )
+                + widths
+                + b'] /FontDescriptor %d 0 R /Encoding %d 0 R >>' % (
+                    descriptor, FONT_ENCODING,
+                ),
+            ),
+            self._object(
+                descriptor,
+                b'<< /Type /FontDescriptor /FontName /' + name
+                + b' /Flags 32 /FontBBox [%d %d %d %d]' % font.bbox
+                + b' /ItalicAngle 0 /Ascent %d /Descent %d /CapHeight %d'
+                % (font.ascent, -font.descent, font.ascent)
+                + b' /StemV 80 /FontFile2 %d 0 R >>' % font_file,
+            ),
+            self._stream_object(
+                font_file,
+                font.data,
+                b' /Length1 %d /Filter /FlateDecode' % font.length,
+            ),
+        ))
+
+    def _width(self, text):
+        return sum(
+            self.widths[code - FIRST_CHAR]
+            for code in _encode(text) if code >= FIRST_CHAR
+        )
+
+    def wrap(self, line):
+        """ Split line on words to fit in the page width. """
+
+        max_width = TEXT_WIDTH * UNITS_PER_EM / FONT_SIZE
+        lines = []
+        current = ''
+        for word in line.split(' '):
+            candidate = f'{current} {word}' if current else word
+            if self._width(candidate) <= max_width:
+                current = candidate
+                continue
+            if current:
+                lines.append(current)
+            # Words longer than the page width are split on characters.
+            current = ''
+            for char in word:
+                if current and self._width(current + char) > max_width:
+                    lines.append(current)
+                    current = ''
+                current += char
+        lines.append(current)
+        return lines
+
+    def _page(self, lines, title=None):
+        commands = [b'BT', b'%d TL' % LEADING]
+        top = PAGE_HEIGHT - MARGIN
+        if title:
+            commands.append(b'/F1 %d Tf' % TITLE_FONT_SIZE)
+            commands.append(b'%d %d Td' % (MARGIN, top))
+            commands.append(b'(' + _escape(title) + b') Tj T* T*')
+        else:
+            commands.append(b'%d %d Td' % (MARGIN, top))
+        commands.append(b'/F1 %d Tf' % FONT_SIZE)
+        commands.extend(b'(' + _escape(line) + b') Tj T*' for line in lines)
+        commands.append(b'ET')
+
+        page, content = self.next_object, self.next_object + 1
+        self.next_object += 2
+        self.pages.append(page)
+        return self._object(
+            page,
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>'
+            % (PAGES, PAGE_WIDTH, PAGE_HEIGHT, FONT, content),
+        ) + self._stream_object(content, b'\n'.join(commands))
+
+    def _trailer(self):
+        kids = b' '.join(b'%d 0 R' % page for page in self.pages)
+        data = self._object(
+            PAGES,
+            b'<< /Type /Pages /Kids [' + kids
+            + b'] /Count %d >>' % len(self.pages),
+        )
+        xref_offset = self.offset
+        size = self.next_object
+        entries = [b'0000000000 65535 f \n']
+        entries.extend(
+            b'%010d 00000 n \n' % self.offsets[number]
+            for number in range(1, size)
+        )
+        return data + b''.join((
+            b'xref\n0 %d\n' % size,
+            *entries,
+            b'trailer\n<< /Size %d /Root %d 0 R >>\n' % (size, CATALOG),
+            b'startxref\n%d\n%%%%EOF\n' % xref_offset,
+        ))
+
+    def stream(self, lines):
+        """ Yield document chunks, one chunk for a page of lines. """
+
+        yield self._header()
+
+        title = self.title
+        page_lines = []
+        for line in lines:
+            for part in self.wrap(line):
+                page_lines.append(part)
+                if len(page_lines) == LINES_PER_PAGE - 2 * bool(title):
+                    yield self._page(page_lines, title)
+                    title = None
+                    page_lines = []
+
+        if page_lines or not self.pages:
+            yield self._page(page_lines, title)
+
+        yield self._trailer()
@@ -0,0 +1,97 @@
+"""
+Fast read only presentation of recipes.
+
+Functions build the same data as RecipeSerializer and its nested
+serializers over loaded objects without creating DRF fields for every
+object. The output is compared with serializers by
+api.tests.test_presenters.
+"""
+
+from recipes.models import Favorite, ShoppingCart
+from users.serializers import is_subscribed
+
+from .fields import get_image_sizes
+
+
+def get_user_flag(recipe, model, annotation, context):
+    """
+    Check relation of request user with recipe, annotation of recipe
+    is used if it is loaded.
+    """
+
+    if hasattr(recipe, annotation):
+        return getattr(recipe, annotation)
+    return model.objects.filter(
+        user=context.get('request').user.id,
+        recipe=recipe,
+    ).exists()
+
+
+def get_file_url(file, request=None):
+    """ Url of file like in presentation of DRF file fields. """
+
+    if not file:
+        return None
+    try:
+        url = file.url
+    except AttributeError:
+        return None
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def present_tag(tag):
+    return {
+        'id': tag.id,
+        'name': str(tag.name),
+        'color': str(tag.color),
+        'slug': str(tag.slug),
+    }
+
+
+def present_author(author, context):
+    return {
+        'email': str(author.email),
+        'id': author.id,
+        'username': str(author.username),
+        'first_name': str(author.first_name),
+        'last_name': str(author.last_name),
+        'is_subscribed': is_subscribed(author, context),
+    }
+
+
+def present_ingredient(ingredient_recipe):
+    ingredient = ingredient_recipe.ingredient
+    return {
+        'id': ingredient.id,
+        'name': ingredient.name,
+        'measurement_unit': ingredient.measurement_unit,
+        'amount': int(ingredient_recipe.amount),
+    }
+
+
+def present_recipe(recipe, context):
+    """ Presentation of recipe equal to RecipeSerializer data. """
+
+    request = context.get('request')
+    return {
+        'id': recipe.id,
+        'tags': [present_tag(tag) for tag in recipe.tags.all()],
+        'author': present_author(recipe.author, context),
+        'ingredients': [
+            present_ingredient(ingredient_recipe)
+            for ingredient_recipe in recipe.ingredients_list.all()
+        ],
+        'is_favorited': get_user_flag(
+            recipe, Favorite, 'is_favorited', context,
+        ),
+        'is_in_shopping_cart': get_user_flag(
+            recipe, ShoppingCart, 'is_in_shopping_cart', context,
+        ),
+        'name': str(recipe.name),
+        'image': get_file_url(recipe.image, request),
+        'image_sizes': get_image_sizes(recipe.image_renditions, request),
+        'text': str(recipe.text),
+        'cooking_time': int(recipe.cooking_time),
+    }
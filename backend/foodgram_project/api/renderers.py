@@ -0,0 +1,120 @@
+import csv
+import os
+
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .pdf import PDFWriter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Line and paragraph separators are escaped like in DRF JSONRenderer.
+JS_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer which encodes compact UTF-8 JSON with orjson if it is
+    installed, output is the same as of DRF JSONRenderer.
+    Indented output and environment without orjson use DRF renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(
+            accepted_media_type, renderer_context or {},
+        ) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+
+        content = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+        for separator, escaped in JS_SEPARATORS:
+            if separator in content:
+                content = content.replace(separator, escaped)
+        return content
+
+
+class EchoBuffer:
+    """ File-like object which returns written value instead of storing. """
+
+    def write(self, value):
+        return value
+
+
+class ShoppingListRenderer(BaseRenderer):
+    """
+    Base renderer for shopping list downloads.
+    Shopping list rows are streamed with `stream` method, errors
+    are rendered as JSON.
+    """
+
+    charset = 'utf-8'
+    title = 'Shopping list'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return FastJSONRenderer().render(data)
+
+    def get_lines(self, rows):
+        for index, row in enumerate(rows, 1):
+            yield (
+                f"{index}. {row['name']} - {row['amount']} "
+                f"{row['measurement_unit']}"
+            )
+
+    def stream(self, rows):
+        raise NotImplementedError('.stream() must be implemented.')
+
+
+class TextShoppingListRenderer(ShoppingListRenderer):
+    """ Plain text shopping list. """
+
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def stream(self, rows):
+        for line in self.get_lines(rows):
+            yield f'{line}\n'.encode(self.charset)
+
+
+class CSVShoppingListRenderer(ShoppingListRenderer):
+    """ CSV shopping list. """
+
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, rows):
+        writer = csv.writer(EchoBuffer())
+        yield writer.writerow(
+            ('name', 'amount', 'measurement_unit')
+        ).encode(self.charset)
+        for row in rows:
+            yield writer.writerow(
+                (row['name'], row['amount'], row['measurement_unit'])
+            ).encode(self.charset)
+
+
+class PDFShoppingListRenderer(ShoppingListRenderer):
+    """ PDF shopping list. """
+
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+
+    def stream(self, rows):
+        font_path = settings.SHOPPING_LIST_PDF_FONT
+        if not os.path.isfile(font_path):
+            font_path = None
+        return PDFWriter(title=self.title, font_path=font_path).stream(
+            self.get_lines(rows),
+        )
@@ -1,16 +1,33 @@
+import json
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.http import QueryDict
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 
 from recipes.models import (
     Favorite, Ingredient, IngredientRecipe, Recipe,
-    ShoppingCart, Subscription, Tag,
+    ShoppingCart, Subscription, Tag, get_recipe_prefetches,
+)
+from recipes.renditions import schedule_renditions
+from users.serializers import UserSerializer, is_subscribed
+
+from .cache import bump_version, get_versions
+from .fields import ImageSizesField, StreamingBase64ImageField
+from .presenters import get_user_flag, present_recipe
+from .signals import (
+    INGREDIENTS_NAMESPACE, TAGS_NAMESPACE, get_author_namespace,
+    get_recipe_namespace,
 )
-from users.serializers import UserSerializer
 
 User = get_user_model()
 
+BATCH_MAX_SIZE = 100
+
 
 class TagSerializer(serializers.ModelSerializer):
     """ Serializer for Tag model. """
@@ -43,8 +60,36 @@ class IngredientRecipeSerializer(serializers.Serializer):
         fields = '__all__'
 
 
+def parse_multipart_data(data, json_fields):
+    """
+    Convert multipart data to dict. Listed fields are sent as JSON
+    strings or, for lists of ids, as repeated fields.
+    """
+
+    parsed = {key: data.get(key) for key in data}
+    for field in json_fields:
+        if field not in data:
+            continue
+        values = data.getlist(field)
+        parsed[field] = values
+        if len(values) == 1:
+            try:
+                value = json.loads(values[0])
+            except ValueError:
+                continue
+            if isinstance(value, list):
+                parsed[field] = value
+    return parsed
+
+
 class RecipeCreateSerializer(serializers.ModelSerializer):
-    """ Serializer for create Recipe objects. """
+    """
+    Serializer for create Recipe objects.
+    Accepts JSON data with base64 encoded image and multipart data with
+    image file, ingredients and tags are JSON strings in multipart data.
+    """
+
+    MULTIPART_JSON_FIELDS = ('ingredients', 'tags')
 
     ingredients = IngredientRecipeSerializer(
         source='ingredientrecipe_set',
@@ -54,7 +99,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         many=True, queryset=Tag.objects.all(),
     )
     author = serializers.HiddenField(default=serializers.CurrentUserDefault())
-    image = Base64ImageField()
+    image = StreamingBase64ImageField()
 
     class Meta:
         model = Recipe
@@ -68,42 +113,196 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             'cooking_time',
         )
 
-    def _create_ingredient_recipe_object(self, recipe):
-        for ingredient in self.initial_data.get('ingredients'):
-            current_ingredient = get_object_or_404(
-                Ingredient, id=ingredient.get('id'),
+    def __init__(self, *args, **kwargs):
+        data = kwargs.get('data')
+        if isinstance(data, QueryDict):
+            kwargs['data'] = parse_multipart_data(
+                data, self.MULTIPART_JSON_FIELDS,
+            )
+        super().__init__(*args, **kwargs)
+
+    def validate(self, attrs):
+        ingredients = self.initial_data.get('ingredients') or []
+        try:
+            ids = [int(ingredient.get('id')) for ingredient in ingredients]
+        except (AttributeError, TypeError, ValueError):
+            raise serializers.ValidationError(
+                {'ingredients': 'Invalid ingredient id.'}
+            )
+
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError(
+                {'ingredients': 'Ingredients must be unique.'}
             )
-            IngredientRecipe.objects.create(
-                amount=ingredient.get('amount'),
+
+        found = Ingredient.objects.in_bulk(ids)
+        missing = [pk for pk in ids if pk not in found]
+        if missing:
+            raise serializers.ValidationError(
+                {'ingredients': f'Ingredients {missing} do not exist.'}
+            )
+
+        if 'ingredientrecipe_set' in attrs:
+            attrs['ingredientrecipe_set'] = {
+                pk: ingredient['amount'] for pk, ingredient in zip(
+                    ids, attrs['ingredientrecipe_set'],
+                )
+            }
+        return attrs
+
+    def _create_ingredient_recipe_objects(self, recipe, amounts):
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(
+                recipe=recipe, ingredient_id=ingredient_id, amount=amount,
+            )
+            for ingredient_id, amount in amounts.items()
+        )
+
+    def _update_ingredient_recipe_objects(self, recipe, amounts):
+        existing = {
+            ingredient_recipe.ingredient_id: ingredient_recipe
+            for ingredient_recipe in IngredientRecipe.objects.filter(
                 recipe=recipe,
-                ingredient=current_ingredient,
             )
+        }
+
+        IngredientRecipe.objects.filter(
+            pk__in=[
+                ingredient_recipe.pk
+                for ingredient_id, ingredient_recipe in existing.items()
+                if ingredient_id not in amounts
+            ],
+        ).delete()
+
+        changed = []
+        for ingredient_id, ingredient_recipe in existing.items():
+            amount = amounts.get(ingredient_id)
+            if amount is not None and amount != ingredient_recipe.amount:
+                ingredient_recipe.amount = amount
+                changed.append(ingredient_recipe)
+        IngredientRecipe.objects.bulk_update(changed, ['amount'])
+
+        self._create_ingredient_recipe_objects(
+            recipe,
+            {
+                ingredient_id: amount
+                for ingredient_id, amount in amounts.items()
+                if ingredient_id not in existing
+            },
+        )
 
+    @transaction.atomic
     def create(self, validated_data):
-        validated_data.pop('ingredientrecipe_set')
+        amounts = validated_data.pop('ingredientrecipe_set')
         tags = validated_data.pop('tags')
 
         recipe = Recipe.objects.create(**validated_data)
         recipe.tags.set(tags)
-        self._create_ingredient_recipe_object(recipe)
+        self._create_ingredient_recipe_objects(recipe, amounts)
+        schedule_renditions(recipe)
 
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        validated_data.pop('ingredientrecipe_set')
-        IngredientRecipe.objects.filter(recipe=instance).delete()
-        self._create_ingredient_recipe_object(instance)
+        amounts = validated_data.pop('ingredientrecipe_set', None)
+        if amounts is not None:
+            self._update_ingredient_recipe_objects(instance, amounts)
+            # Bulk create and update of ingredients send no signals.
+            bump_version(get_recipe_namespace(instance.pk))
+
+        tags = validated_data.pop('tags', None)
+        if tags is not None:
+            instance.tags.set(tags)
 
-        instance.tags.set(validated_data.pop('tags'))
-        return super().update(instance, validated_data)
+        # Renditions of previous image are not presented for the new one.
+        if 'image' in validated_data:
+            validated_data['image_renditions'] = {}
+
+        # Only changed fields are saved to keep counters updated by F().
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(update_fields=list(validated_data))
+
+        if 'image' in validated_data:
+            schedule_renditions(instance)
+        return instance
 
     def to_representation(self, instance):
-        return RecipeSerializer(
-            instance,
-            context={
-                'request': self.context.get('request'),
+        request = self.context.get('request')
+        instance = Recipe.objects.with_related().with_user_flags(
+            request.user,
+        ).get(pk=instance.pk)
+        return RecipeSerializer(instance, context=self.context).data
+
+
+class CachedRecipeListSerializer(serializers.ListSerializer):
+    """
+    List serializer which caches user independent presentation of every
+    recipe for versions of recipe, its author, tags and ingredients.
+    Flags of user are overlaid on cached presentations, tags and
+    ingredients are loaded only for not cached recipes.
+    """
+
+    FRAGMENT_KEY = 'recipe_fragment:{base_url}:{id}:{versions}'
+
+    def _get_keys(self, recipes):
+        request = self.context.get('request')
+        base_url = request.build_absolute_uri('/') if request else ''
+        versions = get_versions(
+            [TAGS_NAMESPACE, INGREDIENTS_NAMESPACE]
+            + [get_recipe_namespace(recipe.pk) for recipe in recipes]
+            + [get_author_namespace(recipe.author_id) for recipe in recipes]
+        )
+        common = (versions[TAGS_NAMESPACE], versions[INGREDIENTS_NAMESPACE])
+        return [
+            self.FRAGMENT_KEY.format(
+                base_url=base_url,
+                id=recipe.pk,
+                versions='.'.join(map(str, (
+                    *common,
+                    versions[get_recipe_namespace(recipe.pk)],
+                    versions[get_author_namespace(recipe.author_id)],
+                ))),
+            )
+            for recipe in recipes
+        ]
+
+    def to_representation(self, data):
+        recipes = list(data)
+        keys = self._get_keys(recipes)
+        fragments = cache.get_many(keys)
+
+        missed = [
+            (recipe, key) for recipe, key in zip(recipes, keys)
+            if key not in fragments
+        ]
+        if missed:
+            prefetch_related_objects(
+                [recipe for recipe, _ in missed], *get_recipe_prefetches()
+            )
+            missed_fragments = {
+                key: self.child.to_representation(recipe)
+                for recipe, key in missed
             }
-        ).data
+            cache.set_many(
+                missed_fragments, settings.RECIPE_FRAGMENT_CACHE_TIMEOUT,
+            )
+            fragments.update(missed_fragments)
+
+        representation = []
+        for recipe, key in zip(recipes, keys):
+            item = fragments[key].copy()
+            item['is_favorited'] = self.child.get_is_favorited(recipe)
+            item['is_in_shopping_cart'] = self.child.get_is_in_shopping_cart(
+                recipe,
+            )
+            item['author'] = item['author'].copy()
+            item['author']['is_subscribed'] = is_subscribed(
+                recipe.author, self.context,
+            )
+            representation.append(item)
+        return representation
 
 
 class RecipeSerializer(serializers.ModelSerializer):
@@ -115,9 +314,11 @@ class RecipeSerializer(serializers.ModelSerializer):
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
     image = Base64ImageField()
+    image_sizes = ImageSizesField()
 
     class Meta:
         model = Recipe
+        list_serializer_class = CachedRecipeListSerializer
         fields = (
             'id',
             'tags',
@@ -127,6 +328,7 @@ class RecipeSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_sizes',
             'text',
             'cooking_time',
         )
@@ -135,25 +337,50 @@ class RecipeSerializer(serializers.ModelSerializer):
         queryset = obj.ingredients_list.all()
         return IngredientRecipeSerializer(queryset, many=True).data
 
-    def _get_method_field(self, recipe, obj):
-        return obj.objects.filter(
-            user=self.context.get('request').user.id,
-            recipe=recipe,
-        ).exists()
+    def _get_method_field(self, recipe, obj, annotation):
+        return get_user_flag(recipe, obj, annotation, self.context)
 
     def get_is_favorited(self, obj):
-        return self._get_method_field(obj, Favorite)
+        return self._get_method_field(obj, Favorite, 'is_favorited')
 
     def get_is_in_shopping_cart(self, obj):
-        return self._get_method_field(obj, ShoppingCart)
+        return self._get_method_field(
+            obj, ShoppingCart, 'is_in_shopping_cart',
+        )
+
+
+class FastRecipeSerializer(RecipeSerializer):
+    """
+    Read only RecipeSerializer which presents recipes with plain
+    functions instead of DRF fields.
+    """
+
+    def to_representation(self, instance):
+        return present_recipe(instance, self.context)
 
 
 class ShortRecipeSerializer(serializers.ModelSerializer):
     """ Serializer for presentation in User serializers. """
 
+    image_sizes = ImageSizesField()
+
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_sizes', 'cooking_time')
+
+
+class RecipeIdsSerializer(serializers.Serializer):
+    """ Serializer for list of recipes ids in batch requests. """
+
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BATCH_MAX_SIZE,
+    )
+
+    def validate_recipes(self, value):
+        # Remove duplicated ids keeping their order.
+        return list(dict.fromkeys(value))
 
 
 class SubscriptionSerializer(serializers.ModelSerializer):
@@ -182,17 +409,22 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         )
 
     def get_is_subscribed(self, obj):
-        return Subscription.objects.filter(
-            follower=obj.follower,
-            author=obj.author,
-        ).exists()
+        # Presented object is the subscription of follower on author.
+        return True
 
     def get_recipes(self, obj):
-        limit = self.context.get('request').query_params.get('recipes_limit')
-        queryset = Recipe.objects.filter(author=obj.author_id)
-        if limit:
-            queryset = queryset[:int(limit)]
+        if hasattr(obj.author, 'limited_recipes'):
+            queryset = obj.author.limited_recipes
+        else:
+            limit = self.context.get('request').query_params.get(
+                'recipes_limit',
+            )
+            queryset = Recipe.objects.filter(author=obj.author_id)
+            if limit:
+                queryset = queryset[:int(limit)]
         return ShortRecipeSerializer(queryset, many=True).data
 
     def get_recipes_count(self, obj):
+        if hasattr(obj, 'recipes_count'):
+            return obj.recipes_count
         return obj.author.recipes.count()
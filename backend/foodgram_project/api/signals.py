@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from recipes.models import Ingredient, IngredientRecipe, Recipe, Tag
+from recipes.renditions import renditions_generated
+
+from .cache import bump_version
+
+User = get_user_model()
+
+TAGS_NAMESPACE = 'tags'
+INGREDIENTS_NAMESPACE = 'ingredients'
+RECIPES_NAMESPACE = 'recipes'
+USERS_NAMESPACE = 'users'
+# Subscriptions have no signals to keep deletes in single query,
+# version is bumped by views which change them.
+SUBSCRIPTIONS_NAMESPACE = 'subscriptions'
+
+
+def get_recipe_namespace(recipe_id):
+    """
+    Namespace of recipe data presented in responses.
+    Ingredients of recipes are also changed in bulk without signals,
+    then version is bumped by serializer which changes them.
+    """
+
+    return f'recipe:{recipe_id}'
+
+
+def get_author_namespace(user_id):
+    """ Namespace of user data presented as author of recipes. """
+
+    return f'author:{user_id}'
+
+
+def get_recipe_flags_namespace(user):
+    """
+    Namespace of favorites and shopping cart of user.
+    Version is bumped by views which change them.
+    """
+
+    return f'recipe_flags:{user.id}'
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tags(**kwargs):
+    bump_version(TAGS_NAMESPACE)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredients(**kwargs):
+    bump_version(INGREDIENTS_NAMESPACE)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipes(instance, **kwargs):
+    bump_version(RECIPES_NAMESPACE)
+    bump_version(get_recipe_namespace(instance.pk))
+
+
+@receiver(post_save, sender=IngredientRecipe)
+@receiver(post_delete, sender=IngredientRecipe)
+def invalidate_recipe_ingredients(instance, **kwargs):
+    bump_version(get_recipe_namespace(instance.recipe_id))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipe_tags(instance, action, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    bump_version(RECIPES_NAMESPACE)
+    if isinstance(instance, Recipe):
+        bump_version(get_recipe_namespace(instance.pk))
+        return
+    for recipe_id in pk_set or ():
+        bump_version(get_recipe_namespace(recipe_id))
+
+
+@receiver(renditions_generated)
+def invalidate_recipe_image(recipe_id, **kwargs):
+    bump_version(get_recipe_namespace(recipe_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_users(instance, **kwargs):
+    bump_version(USERS_NAMESPACE)
+    bump_version(get_author_namespace(instance.pk))
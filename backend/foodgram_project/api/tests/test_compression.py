@@ -0,0 +1,188 @@
+import gzip
+import unittest
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from api import middleware
+from api.middleware import CompressionMiddleware, parse_accept_encoding
+from recipes.models import (
+    Ingredient, IngredientRecipe, Recipe, ShoppingCart,
+)
+
+User = get_user_model()
+
+CONTENT = b'{"name": "Test recipe", "text": "Test text"}' * 100
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024)
+class CompressionMiddlewareTest(SimpleTestCase):
+    """ Test module for compression of responses. """
+
+    def _process(self, response, accept_encoding='gzip, deflate'):
+        request = RequestFactory().get(
+            '/api/recipes/', HTTP_ACCEPT_ENCODING=accept_encoding,
+        )
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_parse_accept_encoding(self):
+        """ Test that encodings with zero quality are not accepted. """
+
+        self.assertEqual(
+            parse_accept_encoding('gzip;q=0, br;q=0.5, deflate, x;q=a'),
+            {'br', 'deflate'},
+            'Invalid accepted encodings',
+        )
+
+    def test_gzip(self):
+        """ Test gzip compression of response. """
+
+        response = self._process(
+            HttpResponse(CONTENT, content_type='application/json'),
+        )
+
+        self.assertEqual(
+            response['Content-Encoding'], 'gzip', 'Response is not compressed',
+        )
+        self.assertEqual(
+            gzip.decompress(response.content), CONTENT, 'Invalid content',
+        )
+        self.assertEqual(
+            response['Content-Length'],
+            str(len(response.content)),
+            'Invalid content length',
+        )
+        self.assertIn(
+            'Accept-Encoding', response['Vary'], 'Vary header is not set',
+        )
+
+    def test_weak_etag(self):
+        """ Test that ETag of compressed response is weak. """
+
+        response = HttpResponse(CONTENT, content_type='application/json')
+        response['ETag'] = '"etag"'
+
+        self.assertEqual(
+            self._process(response)['ETag'], 'W/"etag"', 'ETag is not weak',
+        )
+
+    def test_not_compressed(self):
+        """ Test responses which are sent as is. """
+
+        for response, accept_encoding in (
+            (HttpResponse(CONTENT[:1000]), 'gzip'),
+            (HttpResponse(CONTENT, content_type='image/webp'), 'gzip'),
+            (HttpResponse(CONTENT), 'identity'),
+            (HttpResponse(CONTENT), 'gzip;q=0'),
+        ):
+            response = self._process(response, accept_encoding)
+            self.assertFalse(
+                response.has_header('Content-Encoding'),
+                'Response is compressed',
+            )
+            self.assertTrue(
+                CONTENT.startswith(response.content), 'Content is changed',
+            )
+
+    def test_streaming(self):
+        """ Test compression of small chunks of streaming response. """
+
+        response = self._process(
+            StreamingHttpResponse(
+                CONTENT[index:index + 10]
+                for index in range(0, len(CONTENT), 10)
+            ),
+        )
+        chunks = list(response.streaming_content)
+
+        self.assertEqual(
+            gzip.decompress(b''.join(chunks)), CONTENT, 'Invalid content',
+        )
+        self.assertLess(
+            len(chunks), 10, 'Small chunks are not buffered by compressor',
+        )
+
+    @unittest.skipIf(middleware.brotli is None, 'brotli is not installed')
+    def test_brotli(self):
+        """ Test that brotli is preferred when it is accepted. """
+
+        response = self._process(HttpResponse(CONTENT), 'gzip, br')
+
+        self.assertEqual(
+            response['Content-Encoding'], 'br', 'Wrong content encoding',
+        )
+        self.assertEqual(
+            middleware.brotli.decompress(response.content),
+            CONTENT,
+            'Invalid content',
+        )
+
+    def test_without_brotli(self):
+        """ Test that gzip is used without brotli package. """
+
+        with mock.patch.object(middleware, 'brotli', None):
+            response = self._process(HttpResponse(CONTENT), 'br, gzip')
+
+        self.assertEqual(
+            response['Content-Encoding'], 'gzip', 'Wrong content encoding',
+        )
+
+
+class CompressedDownloadTest(APITestCase):
+    """ Test compression of downloaded shopping list. """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='user1',
+            last_name='test1',
+        )
+        recipe = Recipe.objects.create(
+            author=cls.user,
+            name='Test recipe',
+            text='Test text',
+            image='recipes_photo/test.png',
+            cooking_time=10,
+        )
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(recipe=recipe, ingredient=ingredient, amount=1)
+            for ingredient in Ingredient.objects.bulk_create(
+                Ingredient(name=f'Ingredient {index}', measurement_unit='g')
+                for index in range(100)
+            )
+        )
+        ShoppingCart.objects.create(user=cls.user, recipe=recipe)
+        cls.authenticated_user = APIClient()
+        cls.authenticated_user.force_authenticate(user=cls.user)
+
+    def test_download(self):
+        """ Test that streaming shopping list is compressed. """
+
+        url = reverse('recipe-download-shopping-cart')
+        for file_format in ('txt', 'csv', 'pdf'):
+            content = b''.join(
+                self.authenticated_user.get(
+                    url, {'format': file_format},
+                ).streaming_content
+            )
+            response = self.authenticated_user.get(
+                url, {'format': file_format}, HTTP_ACCEPT_ENCODING='gzip',
+            )
+
+            self.assertEqual(
+                response['Content-Encoding'],
+                'gzip',
+                'Response is not compressed',
+            )
+            self.assertEqual(
+                gzip.decompress(b''.join(response.streaming_content)),
+                content,
+                'Invalid content',
+            )
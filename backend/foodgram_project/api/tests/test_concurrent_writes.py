@@ -0,0 +1,206 @@
+import threading
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from recipes.models import Favorite, Recipe, ShoppingCart, Subscription
+
+User = get_user_model()
+
+
+class IdempotentWritesTest(APITestCase):
+    """ Test favorites, shopping cart and subscriptions writes. """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='user1',
+            last_name='test1',
+        )
+        cls.author = User.objects.create(
+            email='test_user2@user.ru',
+            username='test_user2',
+            first_name='user2',
+            last_name='test2',
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.author,
+            name='Test recipe',
+            text='Test text',
+            image='recipes_photo/test.png',
+            cooking_time=10,
+        )
+        cls.authenticated_user = APIClient()
+        cls.authenticated_user.force_authenticate(user=cls.user)
+
+    def test_repeated_add(self):
+        """ Test that repeated add doesn't change counter. """
+
+        for model, counter in (
+            (Favorite, 'favorites_count'),
+            (ShoppingCart, 'in_carts_count'),
+        ):
+            self.assertTrue(
+                model.objects.add(self.user, self.recipe),
+                'Relation is not created',
+            )
+            self.assertFalse(
+                model.objects.add(self.user, self.recipe),
+                'Relation is created twice',
+            )
+            self.recipe.refresh_from_db()
+            self.assertEqual(
+                getattr(self.recipe, counter), 1, 'Invalid counter value',
+            )
+
+    def test_delete_queries(self):
+        """ Test that delete is decided by rowcount of single DELETE. """
+
+        for url in (
+            reverse('recipe-favorite', kwargs={'pk': self.recipe.pk}),
+            f'/api/recipes/{self.recipe.pk}/shopping_cart/',
+        ):
+            self.authenticated_user.post(url)
+            # DELETE and counter UPDATE inside savepoint.
+            with self.assertNumQueries(4):
+                response = self.authenticated_user.delete(url)
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_204_NO_CONTENT,
+                'Wrong response status',
+            )
+
+    def test_delete_missing_relation(self):
+        """ Test response status for missing relation and object. """
+
+        for url, missing_url in (
+            (
+                reverse('recipe-favorite', kwargs={'pk': self.recipe.pk}),
+                reverse('recipe-favorite', kwargs={'pk': 0}),
+            ),
+            (
+                f'/api/recipes/{self.recipe.pk}/shopping_cart/',
+                '/api/recipes/0/shopping_cart/',
+            ),
+            (
+                f'/api/users/{self.author.pk}/subscribe/',
+                '/api/users/0/subscribe/',
+            ),
+        ):
+            response = self.authenticated_user.delete(url)
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_400_BAD_REQUEST,
+                'Wrong response status',
+            )
+            response = self.authenticated_user.delete(missing_url)
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_404_NOT_FOUND,
+                'Wrong response status',
+            )
+
+    def test_repeated_subscribe(self):
+        """ Test that repeated subscription returns error. """
+
+        url = f'/api/users/{self.author.pk}/subscribe/'
+
+        for expected in (status.HTTP_201_CREATED, status.HTTP_400_BAD_REQUEST):
+            response = self.authenticated_user.post(url)
+            self.assertEqual(
+                response.status_code, expected, 'Wrong response status',
+            )
+
+        self.assertEqual(
+            Subscription.objects.filter(follower=self.user).count(),
+            1,
+            'Invalid subscriptions amount',
+        )
+
+        with self.assertNumQueries(1):
+            response = self.authenticated_user.delete(url)
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_204_NO_CONTENT,
+            'Wrong response status',
+        )
+
+
+@unittest.skipUnless(
+    connection.features.test_db_allows_multiple_connections,
+    'Database does not allow concurrent connections',
+)
+class ConcurrentWritesTest(TransactionTestCase):
+    """ Test concurrent favorites, shopping cart and subscriptions writes. """
+
+    THREADS_AMOUNT = 8
+
+    def setUp(self):
+        self.user = User.objects.create(
+            email='test_user1@user.ru', username='test_user1',
+        )
+        self.author = User.objects.create(
+            email='test_user2@user.ru', username='test_user2',
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.author,
+            name='Test recipe',
+            text='Test text',
+            image='recipes_photo/test.png',
+            cooking_time=10,
+        )
+
+    def _post_concurrently(self, url):
+        """ Post url from several threads at the same time. """
+
+        barrier = threading.Barrier(self.THREADS_AMOUNT)
+        statuses = []
+
+        def post():
+            client = APIClient()
+            client.force_authenticate(user=self.user)
+            try:
+                barrier.wait()
+                statuses.append(client.post(url).status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=post)
+            for _ in range(self.THREADS_AMOUNT)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sorted(statuses)
+
+    def test_concurrent_posts(self):
+        """ Test that only one of concurrent requests creates relation. """
+
+        for url in (
+            reverse('recipe-favorite', kwargs={'pk': self.recipe.pk}),
+            f'/api/recipes/{self.recipe.pk}/shopping_cart/',
+            f'/api/users/{self.author.pk}/subscribe/',
+        ):
+            self.assertEqual(
+                self._post_concurrently(url),
+                [status.HTTP_201_CREATED]
+                + [status.HTTP_400_BAD_REQUEST] * (self.THREADS_AMOUNT - 1),
+                'Wrong response statuses',
+            )
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(
+            (self.recipe.favorites_count, self.recipe.in_carts_count),
+            (1, 1),
+            'Invalid counters',
+        )
@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from recipes.models import Ingredient, Recipe, Tag
+from recipes.renditions import UPLOAD_TO, get_storage
+from .test_recipe_create import IMAGE
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, IMAGE_RENDITIONS_SYNC=1)
+class ImageStorageTest(APITestCase):
+    """ Test module for content addressed storage of recipe images. """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='user1',
+            last_name='test1',
+        )
+        cls.tag = Tag.objects.create(
+            name='Test tag', color='#FF0000', slug='test',
+        )
+        cls.ingredient = Ingredient.objects.create(
+            name='Test ingredient', measurement_unit='g',
+        )
+        cls.authenticated_user = APIClient()
+        cls.authenticated_user.force_authenticate(user=cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(
+            os.path.join(TEMP_MEDIA_ROOT, UPLOAD_TO), ignore_errors=True,
+        )
+
+    def _create(self):
+        return self.authenticated_user.post(
+            reverse('recipe-list'),
+            {
+                'ingredients': [{'id': self.ingredient.id, 'amount': 1}],
+                'tags': [self.tag.id],
+                'image': IMAGE,
+                'name': 'Test recipe',
+                'text': 'Test text',
+                'cooking_time': 10,
+            },
+            format='json',
+        ).json()['id']
+
+    def _files(self):
+        return set(get_storage().listdir(UPLOAD_TO)[1])
+
+    def test_same_images_are_stored_once(self):
+        """ Test that recipes with the same image share the file. """
+
+        first = Recipe.objects.get(pk=self._create())
+        files = self._files()
+        second = Recipe.objects.get(pk=self._create())
+
+        self.assertEqual(
+            first.image.name, second.image.name, 'Image is not shared',
+        )
+        self.assertEqual(self._files(), files, 'Files are duplicated')
+
+    def test_collect_orphans(self):
+        """ Test deleting of files which are not used by recipes. """
+
+        recipe = Recipe.objects.get(pk=self._create())
+        used = self._files()
+        storage = get_storage()
+        orphan = storage.save(
+            os.path.join(UPLOAD_TO, 'orphan.txt'), ContentFile(b'orphan'),
+        )
+
+        call_command('collect_recipe_images', stdout=StringIO())
+        self.assertIn(
+            os.path.basename(orphan),
+            self._files(),
+            'New file is deleted before grace period',
+        )
+
+        old = time.time() - 7200
+        os.utime(storage.path(orphan), (old, old))
+        call_command('collect_recipe_images', '--dry-run', stdout=StringIO())
+        self.assertIn(
+            os.path.basename(orphan), self._files(), 'File is deleted',
+        )
+
+        storage.save(
+            os.path.join(UPLOAD_TO, 'reused.txt'), ContentFile(b'orphan'),
+        )
+        call_command('collect_recipe_images', stdout=StringIO())
+        self.assertIn(
+            os.path.basename(orphan), self._files(), 'Reused file is deleted',
+        )
+
+        os.utime(storage.path(orphan), (old, old))
+        call_command('collect_recipe_images', stdout=StringIO())
+        self.assertEqual(self._files(), used, 'Invalid collected files')
+
+        recipe.delete()
+        call_command(
+            'collect_recipe_images', '--grace', '0', stdout=StringIO(),
+        )
+        self.assertEqual(self._files(), set(), 'Unused files are kept')
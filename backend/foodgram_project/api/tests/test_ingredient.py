@@ -1,10 +1,17 @@
+import time
+import warnings
 from random import randint
+from unittest import mock
 
+from django.conf import settings
+from django.core.cache import CacheKeyWarning, cache
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from recipes.models import Ingredient
+from ..indexes import IngredientPrefixIndex
 from ..serializers import IngredientSerializer
 
 
@@ -23,6 +30,9 @@ class GetIngredientsTest(APITestCase):
             measurement_unit='unit',
         )
 
+    def setUp(self):
+        cache.clear()
+
     def test_amount_ingredients(self):
         """ Test amount of created objects. """
 
@@ -117,3 +127,98 @@ class GetIngredientsTest(APITestCase):
             serializer.data,
             'Invalid response data',
         )
+
+    def _check_name_filter(self, start_with):
+        response = self.client.get(
+            reverse('ingredient-list'), {'name': start_with},
+        )
+
+        filtred_objects = Ingredient.objects.filter(
+            name__istartswith=start_with,
+        ).order_by('name', 'id')
+        serializer = IngredientSerializer(filtred_objects, many=True)
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK,
+            'Wrong response status',
+        )
+        self.assertEqual(
+            response.json(),
+            serializer.data,
+            'Invalid response data',
+        )
+
+    def test_name_filter_with_prefix_index(self):
+        """ Test name filter served by in-memory index. """
+
+        for start_with in ('test', 'TEST', 'Unit', 'unknown'):
+            self._check_name_filter(start_with)
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse('ingredient-list'), {'name': 'tes'})
+
+    def test_name_filter_of_single_ingredient(self):
+        """ Test getting single ingredient with name filter. """
+
+        url = reverse(
+            'ingredient-detail', kwargs={'pk': self.ingredient_1.pk},
+        )
+        for start_with, expected in (
+            ('test', status.HTTP_200_OK),
+            ('unit', status.HTTP_404_NOT_FOUND),
+        ):
+            response = self.client.get(url, {'name': start_with})
+            self.assertEqual(
+                response.status_code, expected, 'Wrong response status',
+            )
+
+    @override_settings(INGREDIENT_PREFIX_INDEX=False)
+    def test_name_filter_without_prefix_index(self):
+        """ Test name filter served by database. """
+
+        for start_with in ('test', 'Unit', 'unknown'):
+            self._check_name_filter(start_with)
+
+    def test_cache_key_of_long_query(self):
+        """ Test that cache key is valid for any query string. """
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            response = self.client.get(
+                reverse('ingredient-list'), {'name': 'unit test ' * 30},
+            )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_200_OK, 'Wrong response status',
+        )
+
+    def test_prefix_index_rebuild(self):
+        """ Test that index is rebuilt after ingredient creation. """
+
+        self._check_name_filter('new')
+        with self.captureOnCommitCallbacks(execute=True):
+            ingredient = Ingredient.objects.create(
+                name='New ingredient', measurement_unit='unit',
+            )
+        self._check_name_filter('new')
+        with self.captureOnCommitCallbacks(execute=True):
+            ingredient.delete()
+        self._check_name_filter('new')
+
+    def test_prefix_index_expiration(self):
+        """ Test that index is rebuilt after timeout without version bump. """
+
+        index = IngredientPrefixIndex()
+        self.assertEqual(index.search('new'), [], 'Invalid search results')
+        # Version is not bumped, like after change in other process.
+        ingredient = Ingredient.objects.create(
+            name='New ingredient', measurement_unit='unit',
+        )
+        self.assertEqual(index.search('new'), [], 'Index is rebuilt')
+
+        expired = time.monotonic() + settings.REFERENCE_CACHE_TIMEOUT + 1
+        with mock.patch('api.indexes.time.monotonic', return_value=expired):
+            self.assertEqual(
+                index.search('new'), [ingredient], 'Index is not rebuilt',
+            )
@@ -0,0 +1,143 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
+
+from api.serializers import FastRecipeSerializer, RecipeSerializer
+from recipes.models import (
+    Favorite, Ingredient, IngredientRecipe, Recipe, ShoppingCart,
+    Subscription, Tag,
+)
+from users.serializers import SUBSCRIBED_AUTHORS
+
+User = get_user_model()
+
+
+class PresentersParityTest(APITestCase):
+    """ Test that fast presentation of recipes equals serializers. """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='Пользователь',
+            last_name='test1',
+        )
+        cls.author = User.objects.create(
+            email='author@user.ru', username='author',
+        )
+        Subscription.objects.create(follower=cls.user, author=cls.author)
+        tags = [
+            Tag.objects.create(name='Завтрак', color='#E26C2D', slug='tag1'),
+            Tag.objects.create(name='Ужин', color='#49B64E', slug='tag2'),
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент "{index}"', measurement_unit='г',
+            )
+            for index in range(3)
+        ]
+        for index, author in enumerate((cls.user, cls.author, cls.author)):
+            recipe = Recipe.objects.create(
+                author=author,
+                name=f'Рецепт {index} \\ "quoted"',
+                text='Текст\nс переносом',
+                image='recipes_photo/test.png',
+                cooking_time=index + 1,
+                image_renditions={} if index else {
+                    'thumbnail': {
+                        'webp': 'recipes_photo/thumb.webp',
+                        'jpeg': 'recipes_photo/thumb.jpeg',
+                    },
+                },
+            )
+            recipe.tags.set(tags[:index])
+            IngredientRecipe.objects.bulk_create(
+                IngredientRecipe(
+                    recipe=recipe, ingredient=ingredient, amount=amount + 1,
+                )
+                for amount, ingredient in enumerate(ingredients[index:])
+            )
+        Favorite.objects.create(user=cls.user, recipe=recipe)
+        ShoppingCart.objects.create(user=cls.user, recipe=recipe)
+
+        cls.authenticated_user = APIClient()
+        cls.authenticated_user.force_authenticate(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def _render(self, serializer_class, recipe, context):
+        return JSONRenderer().render(
+            serializer_class(recipe, context=context).data,
+        )
+
+    def _contexts(self):
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = self.user
+        return (
+            {'request': request},
+            {'request': request, SUBSCRIBED_AUTHORS: {self.author.id}},
+            {'request': request, SUBSCRIBED_AUTHORS: set()},
+            {SUBSCRIBED_AUTHORS: set()},
+        )
+
+    def test_recipe_parity(self):
+        """ Test bytes of recipes with and without loaded annotations. """
+
+        querysets = (
+            Recipe.objects.all(),
+            Recipe.objects.with_related().with_user_flags(self.user),
+        )
+        for queryset in querysets:
+            for recipe in queryset:
+                for context in self._contexts():
+                    if 'request' not in context and not hasattr(
+                        recipe, 'is_favorited',
+                    ):
+                        continue
+                    self.assertEqual(
+                        self._render(FastRecipeSerializer, recipe, context),
+                        self._render(RecipeSerializer, recipe, context),
+                        'Fast presentation differs from serializer',
+                    )
+
+    def test_empty_image_parity(self):
+        """ Test bytes of recipe without image. """
+
+        recipe = Recipe.objects.with_related().with_user_flags(
+            self.user,
+        ).first()
+        recipe.image = ''
+        for context in self._contexts():
+            self.assertEqual(
+                self._render(FastRecipeSerializer, recipe, context),
+                self._render(RecipeSerializer, recipe, context),
+                'Fast presentation differs from serializer',
+            )
+
+    def test_endpoints_parity(self):
+        """ Test bytes of list and detail responses. """
+
+        urls = (
+            reverse('recipe-list'),
+            reverse('recipe-list') + '?cursor=',
+            reverse('recipe-detail', kwargs={'pk': Recipe.objects.first().pk}),
+        )
+        for client in (self.client, self.authenticated_user):
+            for url in urls:
+                responses = []
+                for fast in (0, 1):
+                    cache.clear()
+                    with override_settings(RECIPE_FAST_SERIALIZER=fast):
+                        responses.append(client.get(url).content)
+                self.assertEqual(
+                    responses[0],
+                    responses[1],
+                    'Fast presentation differs from serializer',
+                )
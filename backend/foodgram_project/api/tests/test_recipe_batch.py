@@ -0,0 +1,180 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from api.serializers import BATCH_MAX_SIZE
+from recipes.models import (
+    Favorite, Recipe, ShoppingCart, UserRecipeQuerySet,
+)
+
+User = get_user_model()
+
+
+class RecipeBatchTest(APITestCase):
+    """ Test module for batch favorites and shopping cart endpoints. """
+
+    RECIPES_AMOUNT = 5
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='user1',
+            last_name='test1',
+        )
+        cls.recipes = [
+            Recipe.objects.create(
+                author=cls.user,
+                name=f'Test recipe {index}',
+                text='Test text',
+                image='recipes_photo/test.png',
+                cooking_time=10,
+            )
+            for index in range(cls.RECIPES_AMOUNT)
+        ]
+        cls.ids = [recipe.id for recipe in cls.recipes]
+        cls.missing_id = max(cls.ids) + 1
+        cls.authenticated_user = APIClient()
+        cls.authenticated_user.force_authenticate(user=cls.user)
+        cls.urls = (
+            (reverse('recipe-favorite-batch'), Favorite, 'favorites_count'),
+            (
+                reverse('recipe-shopping-cart-batch'),
+                ShoppingCart,
+                'in_carts_count',
+            ),
+        )
+
+    def test_urls(self):
+        """ Test paths of batch endpoints. """
+
+        self.assertEqual(
+            [url for url, _, _ in self.urls],
+            [
+                '/api/recipes/favorite/batch/',
+                '/api/recipes/shopping_cart/batch/',
+            ],
+            'Invalid urls',
+        )
+
+    def test_add(self):
+        """ Test adding list of recipes with per id results. """
+
+        for url, model, counter in self.urls:
+            model.objects.create(user=self.user, recipe=self.recipes[0])
+            response = self.authenticated_user.post(
+                url,
+                {'recipes': [*self.ids, self.missing_id, self.ids[1]]},
+                format='json',
+            )
+
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_200_OK,
+                'Wrong response status',
+            )
+            self.assertEqual(
+                response.json()['results'],
+                [{'id': self.ids[0], 'status': 'exists'}]
+                + [
+                    {'id': recipe_id, 'status': 'added'}
+                    for recipe_id in self.ids[1:]
+                ]
+                + [{'id': self.missing_id, 'status': 'not_found'}],
+                'Invalid results',
+            )
+            self.assertEqual(
+                model.objects.filter(user=self.user).count(),
+                self.RECIPES_AMOUNT,
+                'Invalid objects amount',
+            )
+            for recipe in self.recipes[1:]:
+                recipe.refresh_from_db()
+                self.assertEqual(
+                    getattr(recipe, counter), 1, 'Invalid counter value',
+                )
+
+    def test_remove(self):
+        """ Test removing list of recipes with per id results. """
+
+        for url, model, counter in self.urls:
+            model.objects.add(self.user, self.recipes[0])
+            response = self.authenticated_user.delete(
+                url, {'recipes': self.ids[:2]}, format='json',
+            )
+
+            self.assertEqual(
+                response.json()['results'],
+                [
+                    {'id': self.ids[0], 'status': 'removed'},
+                    {'id': self.ids[1], 'status': 'missing'},
+                ],
+                'Invalid results',
+            )
+            self.assertFalse(
+                model.objects.filter(user=self.user).exists(),
+                'Objects are not deleted',
+            )
+            self.recipes[0].refresh_from_db()
+            self.assertEqual(
+                getattr(self.recipes[0], counter), 0, 'Invalid counter value',
+            )
+
+    def test_without_returning_rows(self):
+        """ Test statuses on databases without INSERT RETURNING. """
+
+        with mock.patch.object(
+            UserRecipeQuerySet, '_can_return_rows', return_value=False,
+        ):
+            self.test_add()
+            Favorite.objects.all().delete()
+            ShoppingCart.objects.all().delete()
+            Recipe.objects.all().recount(Favorite, ShoppingCart)
+            self.test_remove()
+
+    def test_queries_do_not_depend_on_ids_amount(self):
+        """ Test that amount of queries is constant. """
+
+        url = reverse('recipe-shopping-cart-batch')
+        for amount in (1, self.RECIPES_AMOUNT):
+            ShoppingCart.objects.all().delete()
+            # in_bulk, INSERT and counters UPDATE inside savepoint.
+            with self.assertNumQueries(5):
+                self.authenticated_user.post(
+                    url, {'recipes': self.ids[:amount]}, format='json',
+                )
+
+    def test_invalid_data(self):
+        """ Test validation of recipes ids. """
+
+        url = reverse('recipe-favorite-batch')
+        for data in (
+            {},
+            {'recipes': []},
+            {'recipes': ['id']},
+            {'recipes': list(range(1, BATCH_MAX_SIZE + 2))},
+        ):
+            response = self.authenticated_user.post(url, data, format='json')
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_400_BAD_REQUEST,
+                'Wrong response status',
+            )
+
+    def test_anonymous_user(self):
+        """ Test that batch endpoints are not allowed for anonymous. """
+
+        for url, _, _ in self.urls:
+            response = self.client.post(
+                url, {'recipes': self.ids}, format='json',
+            )
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_401_UNAUTHORIZED,
+                'Wrong response status',
+            )
@@ -0,0 +1,167 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from recipes.models import Favorite, Recipe, ShoppingCart
+
+User = get_user_model()
+
+
+class RecipeCountersTest(APITestCase):
+    """ Test module for favorites and shopping carts counters. """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='user1',
+            last_name='test1',
+        )
+        cls.recipes = [
+            Recipe.objects.create(
+                author=cls.user,
+                name=f'Test recipe {index}',
+                text='Test text',
+                image='recipes_photo/test.png',
+                cooking_time=10,
+            )
+            for index in range(3)
+        ]
+        cls.authenticated_user = APIClient()
+        cls.authenticated_user.force_authenticate(user=cls.user)
+
+    def _counters(self, recipe):
+        recipe.refresh_from_db()
+        return recipe.favorites_count, recipe.in_carts_count
+
+    def test_favorite_counter(self):
+        """ Test changing of favorites counter. """
+
+        recipe = self.recipes[0]
+        url = reverse('recipe-favorite', kwargs={'pk': recipe.pk})
+
+        response = self.authenticated_user.post(url)
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_201_CREATED,
+            'Wrong response status',
+        )
+        self.assertEqual(self._counters(recipe), (1, 0), 'Invalid counters')
+
+        response = self.authenticated_user.delete(url)
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_204_NO_CONTENT,
+            'Wrong response status',
+        )
+        self.assertEqual(self._counters(recipe), (0, 0), 'Invalid counters')
+
+    def test_shopping_cart_counter(self):
+        """ Test changing of shopping carts counter. """
+
+        recipe = self.recipes[0]
+        url = f'/api/recipes/{recipe.pk}/shopping_cart/'
+
+        self.authenticated_user.post(url)
+        self.assertEqual(self._counters(recipe), (0, 1), 'Invalid counters')
+
+        self.authenticated_user.delete(url)
+        self.assertEqual(self._counters(recipe), (0, 0), 'Invalid counters')
+
+    def test_ordering_by_popularity(self):
+        """ Test ordering of recipes by favorites counter. """
+
+        for recipe, count in zip(self.recipes, (5, 10, 5)):
+            Recipe.objects.filter(pk=recipe.pk).update(favorites_count=count)
+
+        response = self.client.get(
+            reverse('recipe-list'), {'ordering': '-favorites_count'},
+        )
+
+        self.assertEqual(
+            [recipe['id'] for recipe in response.json()['results']],
+            [self.recipes[1].id, self.recipes[2].id, self.recipes[0].id],
+            'Invalid ordering',
+        )
+
+    def test_recount_command(self):
+        """ Test recounting of counters with management command. """
+
+        other_user = User.objects.create(
+            email='test_user2@user.ru', username='test_user2',
+        )
+        for user in (self.user, other_user):
+            Favorite.objects.create(user=user, recipe=self.recipes[0])
+        ShoppingCart.objects.create(user=self.user, recipe=self.recipes[1])
+        Recipe.objects.filter(pk=self.recipes[2].pk).update(
+            favorites_count=7,
+        )
+
+        call_command('recount_recipe_counters', stdout=StringIO())
+
+        self.assertEqual(
+            [self._counters(recipe) for recipe in self.recipes],
+            [(2, 0), (0, 1), (0, 0)],
+            'Invalid counters',
+        )
+
+    def test_remove_relation_missed_by_counter(self):
+        """ Test that counter doesn't become negative. """
+
+        # Created without changing counter.
+        Favorite.objects.create(user=self.user, recipe=self.recipes[0])
+
+        response = self.authenticated_user.delete(
+            reverse('recipe-favorite', kwargs={'pk': self.recipes[0].pk}),
+        )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_204_NO_CONTENT,
+            'Wrong response status',
+        )
+        self.assertEqual(
+            self._counters(self.recipes[0]), (0, 0), 'Invalid counters',
+        )
+
+    def test_admin_changes_counters(self):
+        """ Test that counters are recounted by admin. """
+
+        admin = User.objects.create_superuser(
+            email='admin@user.ru', username='admin', password='password',
+        )
+        self.client.force_login(admin)
+
+        for model, counters in (
+            (Favorite, (1, 0)),
+            (ShoppingCart, (0, 1)),
+        ):
+            name = model._meta.model_name
+            self.client.post(
+                reverse(f'admin:recipes_{name}_add'),
+                {'user': self.user.pk, 'recipe': self.recipes[1].pk},
+            )
+            self.assertEqual(
+                self._counters(self.recipes[1]), counters, 'Invalid counters',
+            )
+
+            self.client.post(
+                reverse(f'admin:recipes_{name}_changelist'),
+                {
+                    'action': 'delete_selected',
+                    '_selected_action': model.objects.values_list(
+                        'pk', flat=True,
+                    ),
+                    'post': 'yes',
+                },
+            )
+            self.assertFalse(model.objects.exists(), 'Objects are not deleted')
+            self.assertEqual(
+                self._counters(self.recipes[1]), (0, 0), 'Invalid counters',
+            )
@@ -0,0 +1,371 @@
+import base64
+import json
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from api.fields import BASE64_CHUNK_SIZE
+from recipes.models import Ingredient, IngredientRecipe, Recipe, Tag
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+IMAGE = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABAgMAAABieywaAAAA'
+    'CVBMVEUAAAD///9fX1/S0ecCAAAACXBIWXMAAA7EAAAOxAGVKw4bAAAACklEQVQImWNo'
+    'AAAAggCByxOyYQAAAABJRU5ErkJggg=='
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class CreateRecipeTest(APITestCase):
+    """ Test module for creating and updating recipes. """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='user1',
+            last_name='test1',
+        )
+        cls.tag = Tag.objects.create(
+            name='Test tag', color='#FF0000', slug='test',
+        )
+        cls.ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f'Ingredient {index}', measurement_unit='g')
+            for index in range(30)
+        )
+
+        cls.authenticated_user = APIClient()
+        cls.authenticated_user.force_authenticate(user=cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def _recipe_data(self, ingredients):
+        return {
+            'ingredients': [
+                {'id': ingredient.id, 'amount': amount}
+                for ingredient, amount in ingredients
+            ],
+            'tags': [self.tag.id],
+            'image': IMAGE,
+            'name': 'Test recipe',
+            'text': 'Test text',
+            'cooking_time': 10,
+        }
+
+    def _create(self, ingredients):
+        return self.authenticated_user.post(
+            reverse('recipe-list'),
+            self._recipe_data(ingredients),
+            format='json',
+        )
+
+    def _amounts(self, recipe_id):
+        return dict(
+            IngredientRecipe.objects.filter(
+                recipe=recipe_id,
+            ).values_list('ingredient', 'amount')
+        )
+
+    def test_create_recipe(self):
+        """ Test creating recipe with ingredients. """
+
+        ingredients = [(self.ingredients[0], 5), (self.ingredients[1], 10)]
+        response = self._create(ingredients)
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_201_CREATED,
+            'Wrong response status',
+        )
+        self.assertEqual(
+            self._amounts(response.json()['id']),
+            {ingredient.id: amount for ingredient, amount in ingredients},
+            'Invalid ingredients of recipe',
+        )
+
+    def test_create_with_invalid_ingredient(self):
+        """ Test creating recipe with not existing ingredient. """
+
+        data = self._recipe_data([(self.ingredients[0], 5)])
+        data['ingredients'].append({'id': 0, 'amount': 1})
+        recipes_count = Recipe.objects.count()
+
+        response = self.authenticated_user.post(
+            reverse('recipe-list'), data, format='json',
+        )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_400_BAD_REQUEST,
+            'Wrong response status',
+        )
+        self.assertEqual(
+            Recipe.objects.count(), recipes_count, 'Recipe was created',
+        )
+
+    def test_create_with_duplicated_ingredients(self):
+        """ Test creating recipe with the same ingredient twice. """
+
+        response = self._create(
+            [(self.ingredients[0], 5), (self.ingredients[0], 10)],
+        )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_400_BAD_REQUEST,
+            'Wrong response status',
+        )
+
+    def test_update_recipe_ingredients(self):
+        """ Test updating only changed ingredients of recipe. """
+
+        recipe_id = self._create(
+            [(self.ingredients[0], 5), (self.ingredients[1], 10)],
+        ).json()['id']
+        kept = IngredientRecipe.objects.get(
+            recipe=recipe_id, ingredient=self.ingredients[0],
+        )
+
+        ingredients = [(self.ingredients[0], 7), (self.ingredients[2], 1)]
+        response = self.authenticated_user.patch(
+            reverse('recipe-detail', kwargs={'pk': recipe_id}),
+            self._recipe_data(ingredients),
+            format='json',
+        )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK,
+            'Wrong response status',
+        )
+        self.assertEqual(
+            self._amounts(recipe_id),
+            {ingredient.id: amount for ingredient, amount in ingredients},
+            'Invalid ingredients of recipe',
+        )
+        self.assertTrue(
+            IngredientRecipe.objects.filter(pk=kept.pk).exists(),
+            'Unchanged ingredient was recreated',
+        )
+
+    def test_create_queries_do_not_depend_on_ingredients(self):
+        """ Test amount of queries for recipes with many ingredients. """
+
+        amounts = set()
+        for size in (1, len(self.ingredients)):
+            with CaptureQueriesContext(connection) as context:
+                self._create(
+                    [(ingredient, 1) for ingredient in self.ingredients[:size]]
+                )
+            amounts.add(len(context.captured_queries))
+
+        self.assertEqual(
+            len(amounts), 1, 'Amount of queries depends on ingredients',
+        )
+
+    def test_create_with_invalid_image(self):
+        """ Test validation of base64 encoded image. """
+
+        header, encoded = IMAGE.split(',')
+        big_image = BytesIO()
+        Image.new('RGB', (20, 20)).save(big_image, 'PNG')
+        for image, settings in (
+            ('data:image/png;base64', {}),
+            (f'{header},@@@{encoded}', {}),
+            (base64.b64encode(b'not an image').decode(), {}),
+            (
+                base64.b64encode(big_image.getvalue()).decode(),
+                {'RECIPE_IMAGE_MAX_PIXELS': 100},
+            ),
+            (IMAGE, {'RECIPE_IMAGE_MAX_BYTES': 10}),
+        ):
+            data = self._recipe_data([(self.ingredients[0], 5)])
+            data['image'] = image
+            with override_settings(**settings):
+                response = self.authenticated_user.post(
+                    reverse('recipe-list'), data, format='json',
+                )
+
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_400_BAD_REQUEST,
+                'Wrong response status',
+            )
+            self.assertIn('image', response.json(), 'Invalid error field')
+
+    def test_create_with_line_wrapped_image(self):
+        """ Test base64 encoded image with MIME line breaks. """
+
+        image = BytesIO()
+        # Uncompressed image is decoded in several chunks.
+        Image.new('RGB', (400, 400)).save(image, 'PNG', compress_level=0)
+        data = self._recipe_data([(self.ingredients[0], 5)])
+        data['image'] = base64.encodebytes(image.getvalue()).decode()
+
+        response = self.authenticated_user.post(
+            reverse('recipe-list'), data, format='json',
+        )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_201_CREATED,
+            'Wrong response status',
+        )
+
+    @override_settings(RECIPE_IMAGE_MAX_PIXELS=100)
+    def test_dimensions_are_checked_before_decoding(self):
+        """ Test that too big image is rejected by its header. """
+
+        image = BytesIO()
+        Image.new('RGB', (20, 20)).save(image, 'PNG')
+        # Invalid base64 after the first decoded chunk.
+        data = self._recipe_data([(self.ingredients[0], 5)])
+        data['image'] = (
+            base64.b64encode(image.getvalue() + bytes(BASE64_CHUNK_SIZE))
+            .decode() + '@@@@'
+        )
+
+        response = self.authenticated_user.post(
+            reverse('recipe-list'), data, format='json',
+        )
+
+        self.assertEqual(
+            response.json()['image'],
+            ['Image must have at most 100 pixels.'],
+            'Invalid error',
+        )
+
+    def test_create_with_image_without_header(self):
+        """ Test base64 encoded image without data url header. """
+
+        data = self._recipe_data([(self.ingredients[0], 5)])
+        data['image'] = IMAGE.split(',')[1]
+
+        response = self.authenticated_user.post(
+            reverse('recipe-list'), data, format='json',
+        )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_201_CREATED,
+            'Wrong response status',
+        )
+        self.assertTrue(
+            Recipe.objects.get(pk=response.json()['id']).image.name
+            .endswith('.png'),
+            'Invalid image name',
+        )
+
+    def _multipart_data(self, ingredients, image_format='PNG'):
+        image = BytesIO()
+        Image.new('RGB', (10, 10)).save(image, image_format)
+        image.seek(0)
+        image.name = 'image.upload'
+        return {
+            'ingredients': json.dumps([
+                {'id': ingredient.id, 'amount': amount}
+                for ingredient, amount in ingredients
+            ]),
+            'tags': [self.tag.id],
+            'image': image,
+            'name': 'Test recipe',
+            'text': 'Test text',
+            'cooking_time': 10,
+        }
+
+    def test_create_recipe_with_multipart_data(self):
+        """ Test creating recipe with image file in multipart data. """
+
+        ingredients = [(self.ingredients[0], 5), (self.ingredients[1], 10)]
+        response = self.authenticated_user.post(
+            reverse('recipe-list'),
+            self._multipart_data(ingredients, 'JPEG'),
+            format='multipart',
+        )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_201_CREATED,
+            'Wrong response status',
+        )
+        self.assertEqual(
+            self._amounts(response.json()['id']),
+            {ingredient.id: amount for ingredient, amount in ingredients},
+            'Invalid ingredients of recipe',
+        )
+        recipe = Recipe.objects.get(pk=response.json()['id'])
+        self.assertEqual(
+            list(recipe.tags.all()), [self.tag], 'Invalid tags of recipe',
+        )
+        self.assertTrue(
+            recipe.image.name.endswith('.jpg'), 'Invalid image name',
+        )
+
+    def test_update_recipe_with_multipart_data(self):
+        """ Test updating recipe with multipart data. """
+
+        recipe_id = self._create([(self.ingredients[0], 5)]).json()['id']
+        data = self._multipart_data([(self.ingredients[1], 3)])
+        data['tags'] = json.dumps([self.tag.id])
+
+        response = self.authenticated_user.patch(
+            reverse('recipe-detail', kwargs={'pk': recipe_id}),
+            data,
+            format='multipart',
+        )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK,
+            'Wrong response status',
+        )
+        self.assertEqual(
+            self._amounts(recipe_id),
+            {self.ingredients[1].id: 3},
+            'Invalid ingredients of recipe',
+        )
+
+    def test_create_with_invalid_multipart_data(self):
+        """ Test validation of multipart data. """
+
+        for field, value in (
+            ('ingredients', 'not json'),
+            ('image', BytesIO(b'not an image')),
+        ):
+            data = self._multipart_data([(self.ingredients[0], 5)])
+            data[field] = value
+            with override_settings(RECIPE_IMAGE_MAX_BYTES=10 ** 6):
+                response = self.authenticated_user.post(
+                    reverse('recipe-list'), data, format='multipart',
+                )
+
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_400_BAD_REQUEST,
+                'Wrong response status',
+            )
+            self.assertIn(field, response.json(), 'Invalid error field')
+
+        data = self._multipart_data([(self.ingredients[0], 5)])
+        with override_settings(RECIPE_IMAGE_MAX_BYTES=10):
+            response = self.authenticated_user.post(
+                reverse('recipe-list'), data, format='multipart',
+            )
+        self.assertIn('image', response.json(), 'Invalid error field')
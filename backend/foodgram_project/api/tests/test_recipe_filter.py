@@ -0,0 +1,124 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from recipes.models import Favorite, Recipe, ShoppingCart, Tag, TagRecipe
+from ..filters import RecipeFilter
+
+User = get_user_model()
+
+
+class RecipeTagFilterTest(APITestCase):
+    """ Test module for filtering recipes by tags. """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='user1',
+            last_name='test1',
+        )
+        cls.breakfast = Tag.objects.create(
+            name='Breakfast', color='#FF0000', slug='breakfast',
+        )
+        cls.lunch = Tag.objects.create(
+            name='Lunch', color='#00FF00', slug='lunch',
+        )
+        cls.dinner = Tag.objects.create(
+            name='Dinner', color='#0000FF', slug='dinner',
+        )
+        for name, tags in (
+            ('Both', (cls.breakfast, cls.lunch)),
+            ('Breakfast only', (cls.breakfast,)),
+            ('Dinner only', (cls.dinner,)),
+        ):
+            recipe = Recipe.objects.create(
+                author=cls.user,
+                name=name,
+                text='Test text',
+                image='recipes_photo/test.png',
+                cooking_time=10,
+            )
+            recipe.tags.set(tags)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_filter_by_several_tags(self):
+        """ Test that recipe with several tags is returned once. """
+
+        response = self.client.get(
+            reverse('recipe-list'), {'tags': ['breakfast', 'lunch']},
+        )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK,
+            'Wrong response status',
+        )
+        self.assertEqual(
+            sorted(recipe['name'] for recipe in response.json()['results']),
+            ['Both', 'Breakfast only'],
+            'Invalid filtered objects',
+        )
+        self.assertEqual(response.json()['count'], 2, 'Invalid count')
+
+    def test_filter_query_without_distinct(self):
+        """ Test that tags filter doesn't need DISTINCT. """
+
+        request = APIRequestFactory().get(
+            '/', {'tags': ['breakfast', 'lunch']},
+        )
+        request.user = self.user
+        queryset = RecipeFilter(
+            request.GET, queryset=Recipe.objects.all(), request=request,
+        ).qs
+
+        self.assertNotIn(
+            'DISTINCT', str(queryset.query), 'Query uses DISTINCT',
+        )
+        self.assertNotIn('JOIN', str(queryset.query), 'Query uses JOIN')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'PostgreSQL only')
+class RecipeIndexesTest(RecipeTagFilterTest):
+    """ Test module for usage of composite indexes on PostgreSQL. """
+
+    def _explain(self, queryset):
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+        try:
+            return queryset.explain()
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('RESET enable_seqscan')
+
+    def test_indexes_usage(self):
+        """ Test that lists use composite indexes. """
+
+        for queryset, index in (
+            (
+                TagRecipe.objects.filter(tag=self.breakfast).values('recipe'),
+                'tagrecipe_tag_recipe_idx',
+            ),
+            (
+                Recipe.objects.filter(author=self.user).order_by('-id'),
+                'recipe_author_id_idx',
+            ),
+            (
+                Favorite.objects.filter(user=self.user).order_by('-id'),
+                'favorite_user_id_idx',
+            ),
+            (
+                ShoppingCart.objects.filter(user=self.user).order_by('-id'),
+                'shoppingcart_user_id_idx',
+            ),
+        ):
+            self.assertIn(index, self._explain(queryset), 'Index is not used')
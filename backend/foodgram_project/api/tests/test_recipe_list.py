@@ -0,0 +1,276 @@
+import warnings
+
+from django.contrib.auth import get_user_model
+from django.core.cache import CacheKeyWarning, cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from recipes.models import (
+    Favorite, Ingredient, IngredientRecipe, Recipe, ShoppingCart,
+    Subscription, Tag,
+)
+
+User = get_user_model()
+
+FLAG_TABLES = ('"recipes_favorite"', '"recipes_shoppingcart"')
+
+
+class RecipeListQueriesTest(APITestCase):
+    """ Test amount of queries for recipe list endpoint. """
+
+    RECIPES_AMOUNT = 10
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='user1',
+            last_name='test1',
+        )
+        cls.tag = Tag.objects.create(
+            name='Test tag', color='#FF0000', slug='test',
+        )
+        cls.ingredient = Ingredient.objects.create(
+            name='Test ingredient', measurement_unit='unit',
+        )
+
+        for index in range(cls.RECIPES_AMOUNT):
+            recipe = Recipe.objects.create(
+                author=cls.user,
+                name=f'Test recipe {index}',
+                text='Test text',
+                image='recipes_photo/test.png',
+                cooking_time=10,
+            )
+            recipe.tags.set([cls.tag])
+            IngredientRecipe.objects.create(
+                recipe=recipe, ingredient=cls.ingredient, amount=5,
+            )
+            if index % 2:
+                Favorite.objects.create(user=cls.user, recipe=recipe)
+            else:
+                ShoppingCart.objects.create(user=cls.user, recipe=recipe)
+
+        cls.authenticated_user = APIClient()
+        cls.authenticated_user.force_authenticate(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def _count_flag_queries(self, client, limit):
+        """ Count separate queries to favorite and shopping cart tables. """
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                reverse('recipe-list'), {'limit': limit},
+            )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK,
+            'Wrong response status',
+        )
+        return len([
+            query for query in context.captured_queries
+            if '"recipes_recipe"' not in query['sql']
+            and any(table in query['sql'] for table in FLAG_TABLES)
+        ])
+
+    def test_flag_queries_do_not_depend_on_page_size(self):
+        """ Test that flags are loaded in the main list query. """
+
+        for client in (self.client, self.authenticated_user):
+            for limit in (1, 6, self.RECIPES_AMOUNT):
+                self.assertEqual(
+                    self._count_flag_queries(client, limit),
+                    0,
+                    'Flags are queried for every recipe',
+                )
+
+    def test_queries_do_not_depend_on_page_size(self):
+        """ Test that related objects are not lazy loaded. """
+
+        for client, queries in (
+            (self.client, 4),
+            (self.authenticated_user, 5),
+        ):
+            for limit in (1, 6, self.RECIPES_AMOUNT):
+                cache.clear()
+                with self.assertNumQueries(queries):
+                    client.get(reverse('recipe-list'), {'limit': limit})
+
+    def test_is_subscribed_values(self):
+        """ Test author is_subscribed value for follower. """
+
+        follower = User.objects.create(
+            email='follower@user.ru', username='follower',
+        )
+        Subscription.objects.create(follower=follower, author=self.user)
+        client = APIClient()
+        client.force_authenticate(user=follower)
+
+        for user, expected in ((follower, True), (self.user, False)):
+            client.force_authenticate(user=user)
+            response = client.get(reverse('recipe-list'))
+            for recipe in response.json()['results']:
+                self.assertEqual(
+                    recipe['author']['is_subscribed'],
+                    expected,
+                    'Invalid is_subscribed value',
+                )
+
+    def test_flags_values(self):
+        """ Test annotated flags for authenticated user. """
+
+        response = self.authenticated_user.get(
+            reverse('recipe-list'), {'limit': self.RECIPES_AMOUNT},
+        )
+
+        for recipe in response.json()['results']:
+            self.assertEqual(
+                recipe['is_favorited'],
+                Favorite.objects.filter(
+                    user=self.user, recipe=recipe['id'],
+                ).exists(),
+                'Invalid is_favorited value',
+            )
+            self.assertEqual(
+                recipe['is_in_shopping_cart'],
+                ShoppingCart.objects.filter(
+                    user=self.user, recipe=recipe['id'],
+                ).exists(),
+                'Invalid is_in_shopping_cart value',
+            )
+
+    def test_flags_for_anonymous_user(self):
+        """ Test flags are false for anonymous user. """
+
+        response = self.client.get(reverse('recipe-list'))
+
+        for recipe in response.json()['results']:
+            self.assertFalse(recipe['is_favorited'], 'Invalid flag value')
+            self.assertFalse(
+                recipe['is_in_shopping_cart'], 'Invalid flag value',
+            )
+
+    def test_filter_by_flags(self):
+        """ Test filtering list by annotated flags. """
+
+        response = self.authenticated_user.get(
+            reverse('recipe-list'),
+            {'is_favorited': 1, 'limit': self.RECIPES_AMOUNT},
+        )
+
+        self.assertEqual(
+            response.json()['count'],
+            Favorite.objects.filter(user=self.user).count(),
+            'Invalid filtered objects amount',
+        )
+
+    def test_cached_count(self):
+        """ Test that count is cached for the same filters. """
+
+        self.client.get(reverse('recipe-list'), {'limit': 1})
+
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse('recipe-list'), {'limit': 2, 'page': 2},
+            )
+
+        self.assertEqual(
+            response.json()['count'],
+            self.RECIPES_AMOUNT,
+            'Invalid objects amount',
+        )
+
+    def test_cached_count_invalidation(self):
+        """ Test that count cache is invalidated by writes. """
+
+        self.client.get(reverse('recipe-list'))
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = Recipe.objects.create(
+                author=self.user,
+                name='New recipe',
+                text='Test text',
+                image='recipes_photo/test.png',
+                cooking_time=10,
+            )
+
+        response = self.client.get(reverse('recipe-list'))
+        self.assertEqual(
+            response.json()['count'],
+            self.RECIPES_AMOUNT + 1,
+            'Count cache was not invalidated',
+        )
+
+        params = {'is_favorited': 1}
+        favorites_count = self.authenticated_user.get(
+            reverse('recipe-list'), params,
+        ).json()['count']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authenticated_user.post(
+                reverse('recipe-favorite', kwargs={'pk': recipe.pk}),
+            )
+        response = self.authenticated_user.get(reverse('recipe-list'), params)
+        self.assertEqual(
+            response.json()['count'],
+            favorites_count + 1,
+            'Count cache was not invalidated',
+        )
+
+    def test_count_key_of_long_query(self):
+        """ Test that count cache key is valid for any query string. """
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            response = self.authenticated_user.get(
+                reverse('recipe-list'), {'search': 'test recipe ' * 30},
+            )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_200_OK, 'Wrong response status',
+        )
+
+    def test_cached_fragments_queries(self):
+        """ Test that cached recipes are not loaded from database. """
+
+        params = {'limit': self.RECIPES_AMOUNT}
+        self.authenticated_user.get(reverse('recipe-list'), params)
+
+        # Subscribed authors and page of recipes with flags.
+        with self.assertNumQueries(2):
+            self.authenticated_user.get(reverse('recipe-list'), params)
+
+    def test_cached_fragments_overlay(self):
+        """ Test that cached recipes are presented with flags of user. """
+
+        other_user = User.objects.create(
+            email='other@user.ru', username='other',
+        )
+        Subscription.objects.create(follower=other_user, author=self.user)
+        Favorite.objects.create(
+            user=other_user, recipe=Recipe.objects.first(),
+        )
+        client = APIClient()
+        client.force_authenticate(user=other_user)
+        params = {'limit': self.RECIPES_AMOUNT}
+
+        expected = {}
+        for user_client in (self.authenticated_user, client):
+            cache.clear()
+            expected[user_client] = user_client.get(
+                reverse('recipe-list'), params,
+            ).json()
+
+        cache.clear()
+        for user_client in (self.authenticated_user, client):
+            self.assertEqual(
+                user_client.get(reverse('recipe-list'), params).json(),
+                expected[user_client],
+                'Cached recipes differ from not cached',
+            )
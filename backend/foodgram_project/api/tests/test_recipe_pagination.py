@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from recipes.models import Recipe
+
+User = get_user_model()
+
+
+class RecipeCursorPaginationTest(APITestCase):
+    """ Test module for keyset pagination of recipes. """
+
+    RECIPES_AMOUNT = 7
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='user1',
+            last_name='test1',
+        )
+        Recipe.objects.bulk_create(
+            Recipe(
+                author=cls.user,
+                name=f'Test recipe {index}',
+                text='Test text',
+                image='recipes_photo/test.png',
+                cooking_time=10,
+            )
+            for index in range(cls.RECIPES_AMOUNT)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_number_pagination_by_default(self):
+        """ Test that page number pagination is used without cursor. """
+
+        response = self.client.get(reverse('recipe-list'))
+
+        self.assertEqual(
+            response.json()['count'],
+            self.RECIPES_AMOUNT,
+            'Invalid response data',
+        )
+
+    def _walk_cursor_pages(self, params):
+        url = f"{reverse('recipe-list')}?cursor=&limit=3&{params}"
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_200_OK,
+                'Wrong response status',
+            )
+            data = response.json()
+            self.assertNotIn('count', data, 'Count is present in response')
+            ids.extend(recipe['id'] for recipe in data['results'])
+            url = data['next']
+        return ids
+
+    def test_cursor_pagination(self):
+        """ Test walking through all pages with cursor. """
+
+        self.assertEqual(
+            self._walk_cursor_pages(''),
+            list(Recipe.objects.order_by('-id').values_list('id', flat=True)),
+            'Invalid order of recipes',
+        )
+
+    def test_cursor_pagination_ignores_ordering(self):
+        """ Test that cursor pages are ordered by id with ordering param. """
+
+        Recipe.objects.filter(
+            pk=Recipe.objects.order_by('id').values('pk')[:1],
+        ).update(favorites_count=1)
+
+        self.assertEqual(
+            self._walk_cursor_pages('ordering=-favorites_count'),
+            list(Recipe.objects.order_by('-id').values_list('id', flat=True)),
+            'Invalid order of recipes',
+        )
+
+    def test_cursor_pagination_without_count_query(self):
+        """ Test that cursor page doesn't count recipes. """
+
+        with self.assertNumQueries(3):
+            self.client.get(reverse('recipe-list'), {'cursor': ''})
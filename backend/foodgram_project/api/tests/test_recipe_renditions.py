@@ -0,0 +1,165 @@
+import base64
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from recipes.models import Ingredient, Recipe, Tag
+from recipes.renditions import RENDITIONS
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_image(size, color='red'):
+    buffer = BytesIO()
+    Image.new('RGBA', size, color).save(buffer, 'PNG')
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/png;base64,{encoded}'
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, IMAGE_RENDITIONS_SYNC=1)
+class RecipeRenditionsTest(APITestCase):
+    """ Test module for renditions of recipe images. """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='user1',
+            last_name='test1',
+        )
+        cls.tag = Tag.objects.create(
+            name='Test tag', color='#FF0000', slug='test',
+        )
+        cls.ingredient = Ingredient.objects.create(
+            name='Test ingredient', measurement_unit='g',
+        )
+        cls.authenticated_user = APIClient()
+        cls.authenticated_user.force_authenticate(user=cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def _create(self, image):
+        return self.authenticated_user.post(
+            reverse('recipe-list'),
+            {
+                'ingredients': [{'id': self.ingredient.id, 'amount': 1}],
+                'tags': [self.tag.id],
+                'image': image,
+                'name': 'Test recipe',
+                'text': 'Test text',
+                'cooking_time': 10,
+            },
+            format='json',
+        )
+
+    def test_renditions_sizes(self):
+        """ Test sizes and formats of generated renditions. """
+
+        response = self._create(make_image((2000, 1000)))
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_201_CREATED,
+            'Wrong response status',
+        )
+        recipe = Recipe.objects.get(pk=response.json()['id'])
+        self.assertEqual(
+            set(response.json()['image_sizes']),
+            {size for size, _ in RENDITIONS},
+            'Invalid image sizes',
+        )
+        for size, max_side in RENDITIONS:
+            files = recipe.image_renditions[size]
+            self.assertEqual(
+                set(files), {'webp', 'jpeg'}, 'Invalid image formats',
+            )
+            for image_format, name in files.items():
+                self.assertTrue(
+                    response.json()['image_sizes'][size][image_format]
+                    .endswith(name),
+                    'Invalid rendition url',
+                )
+                with default_storage.open(name) as image_file:
+                    with Image.open(image_file) as image:
+                        self.assertEqual(
+                            image.size,
+                            (max_side, max_side // 2),
+                            'Invalid rendition size',
+                        )
+
+    def test_content_hashed_names(self):
+        """ Test that same images share rendition files. """
+
+        image = make_image((300, 300), 'blue')
+        first = self._create(image).json()['image_sizes']
+        second = self._create(image).json()['image_sizes']
+        other = self._create(make_image((300, 300), 'green'))
+
+        self.assertEqual(first, second, 'Renditions are not shared')
+        self.assertNotEqual(
+            first, other.json()['image_sizes'], 'Renditions are shared',
+        )
+
+    def test_small_image_is_not_upscaled(self):
+        """ Test that renditions are not larger than the image. """
+
+        response = self._create(make_image((100, 50)))
+        recipe = Recipe.objects.get(pk=response.json()['id'])
+
+        for files in recipe.image_renditions.values():
+            with default_storage.open(files['webp']) as image_file:
+                with Image.open(image_file) as image:
+                    self.assertEqual(
+                        image.size, (100, 50), 'Image is upscaled',
+                    )
+
+    @override_settings(IMAGE_RENDITIONS_SYNC=0)
+    def test_renditions_after_commit(self):
+        """ Test that renditions are scheduled after commit. """
+
+        with mock.patch('recipes.renditions._get_executor') as executor:
+            with self.captureOnCommitCallbacks() as callbacks:
+                response = self._create(make_image((300, 300)))
+            executor.assert_not_called()
+            for callback in callbacks:
+                callback()
+
+        executor().submit.assert_called_once()
+        self.assertEqual(
+            response.json()['image_sizes'], {}, 'Invalid image sizes',
+        )
+
+    @override_settings(IMAGE_RENDITIONS_SYNC=0)
+    def test_command(self):
+        """ Test generating of missing renditions with command. """
+
+        with self.captureOnCommitCallbacks():
+            recipe_id = self._create(make_image((300, 300))).json()['id']
+
+        call_command('generate_recipe_renditions', stdout=StringIO())
+
+        response = self.client.get(
+            reverse('recipe-detail', kwargs={'pk': recipe_id}),
+        )
+        self.assertEqual(
+            set(response.json()['image_sizes']),
+            {size for size, _ in RENDITIONS},
+            'Renditions are not generated',
+        )
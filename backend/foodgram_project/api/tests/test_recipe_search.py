@@ -0,0 +1,88 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from recipes.models import Recipe
+
+User = get_user_model()
+
+
+class RecipeSearchTest(APITestCase):
+    """ Test module for searching recipes by name and text. """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='user1',
+            last_name='test1',
+        )
+        cls.recipes = {
+            name: Recipe.objects.create(
+                author=cls.user,
+                name=name,
+                text=text,
+                image='recipes_photo/test.png',
+                cooking_time=10,
+            )
+            for name, text in (
+                ('Борщ', 'Суп со свёклой и капустой'),
+                ('Щи', 'Суп с капустой'),
+                ('Блины', 'Тонкие блины на молоке'),
+            )
+        }
+
+    def setUp(self):
+        cache.clear()
+
+    def _search(self, query):
+        response = self.client.get(reverse('recipe-list'), {'search': query})
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK,
+            'Wrong response status',
+        )
+        return [recipe['name'] for recipe in response.json()['results']]
+
+    def test_search_by_name(self):
+        """ Test searching recipes by name. """
+
+        self.assertEqual(self._search('Борщ'), ['Борщ'], 'Invalid results')
+
+    def test_search_by_text(self):
+        """ Test searching recipes by text. """
+
+        self.assertEqual(
+            sorted(self._search('капустой')),
+            ['Борщ', 'Щи'],
+            'Invalid results',
+        )
+
+    def test_search_without_results(self):
+        """ Test searching recipes without matches. """
+
+        self.assertEqual(self._search('пицца'), [], 'Invalid results')
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL only')
+    def test_search_ranking(self):
+        """ Test that matches by name are ranked higher than by text. """
+
+        Recipe.objects.create(
+            author=self.user,
+            name='Капуста тушеная',
+            text='Тушеная капуста',
+            image='recipes_photo/test.png',
+            cooking_time=10,
+        )
+
+        self.assertEqual(
+            self._search('капуста')[0], 'Капуста тушеная', 'Invalid ranking',
+        )
@@ -0,0 +1,83 @@
+import datetime
+import decimal
+import uuid
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APITestCase
+
+from api import renderers
+from api.renderers import FastJSONRenderer
+
+User = get_user_model()
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    """ Test module for fast JSON renderer. """
+
+    DATA = {
+        'name': 'Борщ\u2028с салом\u2029',
+        'amount': decimal.Decimal('1.50'),
+        'created': datetime.datetime(2022, 8, 1, 12, 30, 15, 123456),
+        'date': datetime.date(2022, 8, 1),
+        'uuid': uuid.UUID(int=1),
+        'items': ({'id': 1, 'ratio': 0.1}, [None, True]),
+        1: 'key',
+    }
+
+    def test_parity(self):
+        """ Test that content is the same as of DRF renderer. """
+
+        self.assertEqual(
+            FastJSONRenderer().render(self.DATA),
+            JSONRenderer().render(self.DATA),
+            'Different content',
+        )
+
+    def test_fallback(self):
+        """ Test rendering without orjson and with indent. """
+
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(
+                FastJSONRenderer().render(self.DATA),
+                JSONRenderer().render(self.DATA),
+                'Different content without orjson',
+            )
+
+        media_type = 'application/json; indent=2'
+        self.assertEqual(
+            FastJSONRenderer().render(self.DATA, media_type),
+            JSONRenderer().render(self.DATA, media_type),
+            'Different indented content',
+        )
+
+    def test_empty(self):
+        """ Test that None is rendered as empty content. """
+
+        self.assertEqual(
+            FastJSONRenderer().render(None), b'', 'Content is not empty',
+        )
+
+
+class DefaultRendererTest(APITestCase):
+    """ Test that API responses are rendered as raw UTF-8. """
+
+    def test_utf8_response(self):
+        user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='Иван',
+            last_name='Петров',
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.get('/api/users/me/')
+
+        self.assertEqual(
+            response['Content-Type'], 'application/json', 'Wrong media type',
+        )
+        self.assertIn(
+            'Иван'.encode(), response.content, 'Content is not raw UTF-8',
+        )
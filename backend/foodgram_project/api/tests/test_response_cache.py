@@ -0,0 +1,170 @@
+import warnings
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import CacheKeyWarning, cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from api.cache import get_counter
+from recipes.models import Ingredient, IngredientRecipe, Recipe, Tag
+
+User = get_user_model()
+
+
+class AnonymousResponseCacheTest(APITestCase):
+    """ Test module for cached responses of recipes for anonymous. """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='user1',
+            last_name='test1',
+        )
+        cls.tag = Tag.objects.create(
+            name='Test tag', color='#FF0000', slug='test',
+        )
+        cls.ingredient = Ingredient.objects.create(
+            name='Test ingredient', measurement_unit='g',
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.user,
+            name='Test recipe',
+            text='Test text',
+            image='recipes_photo/test.png',
+            cooking_time=10,
+        )
+        cls.recipe.tags.set([cls.tag])
+        IngredientRecipe.objects.create(
+            recipe=cls.recipe, ingredient=cls.ingredient, amount=5,
+        )
+        cls.authenticated_user = APIClient()
+        cls.authenticated_user.force_authenticate(user=cls.user)
+        cls.detail_url = reverse('recipe-detail', kwargs={'pk': cls.recipe.pk})
+
+    def setUp(self):
+        cache.clear()
+
+    def _assert_cache(self, url, expected, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(
+            response['X-Cache'], expected, 'Invalid cache status',
+        )
+        return response.json()
+
+    def test_cached_responses(self):
+        """ Test that repeated anonymous requests are cached. """
+
+        for url in (reverse('recipe-list'), self.detail_url):
+            data = self._assert_cache(url, 'MISS')
+            with self.assertNumQueries(0):
+                self.assertEqual(
+                    self._assert_cache(url, 'HIT'),
+                    data,
+                    'Cached response differs',
+                )
+
+        self.assertEqual(
+            (
+                get_counter('response_cache:recipes:hit'),
+                get_counter('response_cache:recipes:miss'),
+            ),
+            (2, 2),
+            'Invalid metrics',
+        )
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            'response_cache_metrics', '--reset', stdout=stdout, stderr=stderr,
+        )
+        self.assertIn('2 hits, 2 misses', stdout.getvalue(), 'Invalid output')
+        self.assertIn(
+            'not shared between processes',
+            stderr.getvalue(),
+            'Per process cache is not reported',
+        )
+        self.assertEqual(
+            get_counter('response_cache:recipes:hit'),
+            0,
+            'Metrics are not reset',
+        )
+
+    def test_normalized_query(self):
+        """ Test that order and unknown query params share the entry. """
+
+        url = reverse('recipe-list')
+        self._assert_cache(url, 'MISS', {'limit': 1, 'page': 1})
+        self._assert_cache(url, 'HIT', {'unknown': 1, 'page': 1, 'limit': 1})
+        self._assert_cache(url, 'MISS', {'limit': 2, 'page': 1})
+
+    def test_long_query(self):
+        """ Test that cache key is valid for any query string. """
+
+        url = reverse('recipe-list')
+        params = {'search': 'test recipe ' * 30}
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            self._assert_cache(url, 'MISS', params)
+            self._assert_cache(url, 'HIT', params)
+
+    def test_authenticated_user_is_not_cached(self):
+        """ Test that responses for users are not cached. """
+
+        self.client.get(self.detail_url)
+        response = self.authenticated_user.get(self.detail_url)
+
+        self.assertNotIn('X-Cache', response, 'Response is cached')
+
+    def test_invalidation(self):
+        """ Test that changes of recipe and related objects invalidate. """
+
+        list_url = reverse('recipe-list')
+        for change in (
+            lambda: Recipe.objects.get(pk=self.recipe.pk).save(),
+            lambda: self.recipe.tags.clear(),
+            lambda: self.user.save(),
+            lambda: self.tag.save(),
+            lambda: self.ingredient.save(),
+            lambda: IngredientRecipe.objects.get(recipe=self.recipe).save(),
+            lambda: self.authenticated_user.patch(
+                self.detail_url,
+                {'ingredients': [{'id': self.ingredient.id, 'amount': 1}]},
+                format='json',
+            ),
+        ):
+            for url in (list_url, self.detail_url):
+                self.client.get(url)
+                self._assert_cache(url, 'HIT')
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            for url in (list_url, self.detail_url):
+                self._assert_cache(url, 'MISS')
+
+    def test_invalidation_after_commit(self):
+        """ Test that version is bumped after transaction commit. """
+
+        self.client.get(self.detail_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Recipe.objects.get(pk=self.recipe.pk).save()
+            self._assert_cache(self.detail_url, 'HIT')
+        self._assert_cache(self.detail_url, 'MISS')
+
+    def test_other_recipe_does_not_invalidate_detail(self):
+        """ Test that detail depends only on its recipe and author. """
+
+        self._assert_cache(self.detail_url, 'MISS')
+        other = User.objects.create(
+            email='test_user2@user.ru', username='test_user2',
+        )
+        Recipe.objects.create(
+            author=other,
+            name='Other recipe',
+            text='Test text',
+            image='recipes_photo/test.png',
+            cooking_time=10,
+        )
+
+        self._assert_cache(self.detail_url, 'HIT')
@@ -0,0 +1,202 @@
+import os
+import re
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from api.pdf import ENCODING, FIRST_CHAR, FONT_SIZE, TEXT_WIDTH, get_font
+from recipes.models import (
+    Ingredient, IngredientRecipe, Recipe, ShoppingCart,
+)
+
+User = get_user_model()
+
+
+class DownloadShoppingCartTest(APITestCase):
+    """ Test module for downloading shopping list. """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='user1',
+            last_name='test1',
+        )
+        cls.salt = Ingredient.objects.create(
+            name='Salt', measurement_unit='g',
+        )
+        cls.water = Ingredient.objects.create(
+            name='Water', measurement_unit='ml',
+        )
+
+        for index, amounts in enumerate(((5, 100), (10, 250), (1, 0))):
+            recipe = Recipe.objects.create(
+                author=cls.user,
+                name=f'Test recipe {index}',
+                text='Test text',
+                image='recipes_photo/test.png',
+                cooking_time=10,
+            )
+            for ingredient, amount in zip((cls.salt, cls.water), amounts):
+                IngredientRecipe.objects.create(
+                    recipe=recipe, ingredient=ingredient, amount=amount,
+                )
+            if index < 2:
+                ShoppingCart.objects.create(user=cls.user, recipe=recipe)
+
+        cls.authenticated_user = APIClient()
+        cls.authenticated_user.force_authenticate(user=cls.user)
+
+    def test_download_without_authentication(self):
+        """ Test downloading for anonymous user. """
+
+        response = self.client.get(
+            reverse('recipe-download-shopping-cart'),
+        )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_401_UNAUTHORIZED,
+            'Wrong response status',
+        )
+
+    def _download(self, file_format=None, **headers):
+        params = {'format': file_format} if file_format else {}
+        response = self.authenticated_user.get(
+            reverse('recipe-download-shopping-cart'), params, **headers,
+        )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK,
+            'Wrong response status',
+        )
+        self.assertTrue(response.streaming, 'Response is not streaming')
+        return response, b''.join(response.streaming_content)
+
+    def test_download_shopping_list(self):
+        """ Test summing of ingredients from shopping cart. """
+
+        response, content = self._download()
+
+        self.assertEqual(
+            response['Content-Type'],
+            'text/plain; charset=utf-8',
+            'Invalid content type',
+        )
+        self.assertEqual(
+            content.decode(),
+            '1. Salt - 15 g\n2. Water - 350 ml\n',
+            'Invalid shopping list',
+        )
+
+    def test_download_csv(self):
+        """ Test CSV format of shopping list. """
+
+        response, content = self._download('csv')
+
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename=shopping_list.csv',
+            'Invalid file name',
+        )
+        self.assertEqual(
+            content.decode(),
+            'name,amount,measurement_unit\r\nSalt,15,g\r\nWater,350,ml\r\n',
+            'Invalid shopping list',
+        )
+
+    def test_download_pdf(self):
+        """ Test PDF format of shopping list. """
+
+        Ingredient.objects.filter(pk=self.salt.pk).update(name='Соль')
+
+        response, content = self._download('pdf')
+
+        self.assertEqual(
+            response['Content-Type'], 'application/pdf', 'Invalid type',
+        )
+        self.assertTrue(content.startswith(b'%PDF-'), 'Invalid PDF header')
+        self.assertTrue(content.endswith(b'%%EOF\n'), 'Invalid PDF end')
+        self.assertIn(
+            '2. Соль - 15 g'.encode('cp1251'), content, 'Invalid PDF text',
+        )
+
+        xref_offset = int(content.split(b'startxref\n')[1].split()[0])
+        self.assertTrue(
+            content[xref_offset:].startswith(b'xref'),
+            'Invalid cross-reference table offset',
+        )
+
+    def test_download_text_by_default(self):
+        """ Test that text is sent for unknown format or media type. """
+
+        for file_format, headers in (
+            ('xls', {}),
+            (None, {'HTTP_ACCEPT': 'application/json'}),
+        ):
+            with self.subTest(file_format=file_format, headers=headers):
+                response, content = self._download(file_format, **headers)
+
+                self.assertEqual(
+                    response['Content-Disposition'],
+                    'attachment; filename=shopping_list.txt',
+                    'Invalid file name',
+                )
+                self.assertEqual(
+                    content.decode(),
+                    '1. Salt - 15 g\n2. Water - 350 ml\n',
+                    'Invalid shopping list',
+                )
+
+    @skipUnless(
+        os.path.isfile(settings.SHOPPING_LIST_PDF_FONT), 'Font is missing',
+    )
+    def test_download_pdf_wraps_long_lines(self):
+        """ Test that font is embedded and long lines are wrapped. """
+
+        name = 'Очень длинное название ингредиента ' * 4 + 'Ж' * 60
+        Ingredient.objects.filter(pk=self.salt.pk).update(name=name)
+
+        response, content = self._download('pdf')
+
+        self.assertIn(b'/FontFile2', content, 'Font is not embedded')
+        widths = get_font(settings.SHOPPING_LIST_PDF_FONT).widths
+        lines = [
+            line.decode(ENCODING)
+            for line in re.findall(rb'\((.*?)\) Tj', content)[1:]
+        ]
+        for line in lines:
+            width = sum(
+                widths[ord(char.encode(ENCODING)) - FIRST_CHAR]
+                for char in line
+            ) * FONT_SIZE / 1000
+            self.assertLessEqual(width, TEXT_WIDTH, 'Line is not wrapped')
+        self.assertEqual(
+            ''.join(lines).replace(' ', ''),
+            f'1.Water-350ml2.{name}-15g'.replace(' ', ''),
+            'Invalid PDF text',
+        )
+
+    @override_settings(SHOPPING_LIST_PDF_FONT='')
+    def test_download_pdf_without_font(self):
+        """ Test that standard font is used if font file is missing. """
+
+        response, content = self._download('pdf')
+
+        self.assertIn(b'/BaseFont /Helvetica', content, 'Invalid font')
+        self.assertNotIn(b'/FontFile2', content, 'Font is embedded')
+        self.assertIn(b'(1. Salt - 15 g) Tj', content, 'Invalid PDF text')
+
+    def test_download_in_constant_queries(self):
+        """ Test that shopping list is aggregated in single query. """
+
+        with self.assertNumQueries(1):
+            self._download()
@@ -1,11 +1,16 @@
+import time
 from random import randint
 
+from django.core.cache import cache
 from django.urls import reverse
+from django.utils.http import http_date
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from recipes.models import Tag
+from ..cache import VERSION_KEY
 from ..serializers import TagSerializer
+from ..signals import TAGS_NAMESPACE
 
 
 class GetTagsTest(APITestCase):
@@ -25,6 +30,9 @@ class GetTagsTest(APITestCase):
             slug='test2',
         )
 
+    def setUp(self):
+        cache.clear()
+
     def test_amount_tags(self):
         """ Test amount of created objects. """
 
@@ -92,3 +100,92 @@ class GetTagsTest(APITestCase):
             status.HTTP_404_NOT_FOUND,
             'Wrong response status',
         )
+
+    def test_cached_list(self):
+        """ Test that list is served from cache without queries. """
+
+        self.client.get(reverse('tag-list'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('tag-list'))
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK,
+            'Wrong response status',
+        )
+        self.assertEqual(
+            response.json(),
+            TagSerializer(Tag.objects.all(), many=True).data,
+            'Invalid response data',
+        )
+
+    def _set_version_age(self, seconds):
+        cache.set(
+            VERSION_KEY.format(namespace=TAGS_NAMESPACE),
+            time.time_ns() - seconds * 10 ** 9,
+            timeout=None,
+        )
+
+    def test_not_modified(self):
+        """ Test conditional request with ETag and Last-Modified. """
+
+        self._set_version_age(10)
+        response = self.client.get(reverse('tag-list'))
+
+        self.assertIn('ETag', response, 'ETag header is missing')
+        self.assertIn('Last-Modified', response, 'Last-Modified is missing')
+
+        for header, value in (
+            ('HTTP_IF_NONE_MATCH', response['ETag']),
+            ('HTTP_IF_MODIFIED_SINCE', response['Last-Modified']),
+        ):
+            conditional_response = self.client.get(
+                reverse('tag-list'), **{header: value},
+            )
+            self.assertEqual(
+                conditional_response.status_code,
+                status.HTTP_304_NOT_MODIFIED,
+                'Wrong response status',
+            )
+
+    def test_last_modified_of_recent_change(self):
+        """ Test that Last-Modified isn't used in the second of change. """
+
+        self._set_version_age(0)
+        response = self.client.get(reverse('tag-list'))
+
+        self.assertNotIn('Last-Modified', response, 'Last-Modified is sent')
+        response = self.client.get(
+            reverse('tag-list'), HTTP_IF_MODIFIED_SINCE=http_date(),
+        )
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK,
+            'Wrong response status',
+        )
+
+    def test_invalidation_on_change(self):
+        """ Test that cache is invalidated on tag change. """
+
+        etag = self.client.get(reverse('tag-list'))['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag = Tag.objects.create(
+                name='New tag', color='#00FF00', slug='new',
+            )
+        response = self.client.get(
+            reverse('tag-list'), HTTP_IF_NONE_MATCH=etag,
+        )
+        tag.delete()
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK,
+            'Wrong response status',
+        )
+        self.assertIn(
+            tag.name,
+            [tag['name'] for tag in response.json()],
+            'Cache was not invalidated',
+        )
@@ -1,61 +1,218 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.http import HttpResponse
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from recipes.models import (
-    Favorite, Ingredient, Recipe, ShoppingCart, Subscription, Tag,
+    Favorite, Ingredient, IngredientRecipe, Recipe, ShoppingCart,
+    Subscription, Tag,
 )
-from .filters import IngredientSearchFilter, RecipeFilter
-from .pagination import LimitPageNumberPagination
+from users.serializers import SUBSCRIBED_AUTHORS, get_subscribed_authors
+
+from .cache import (
+    AnonymousResponseCacheMixin, CachedReferenceMixin, bump_version,
+)
+from .filters import (
+    IngredientSearchFilter, RecipeFilter, RecipeOrderingFilter,
+)
+from .pagination import LimitCursorPagination, LimitPageNumberPagination
 from .permissions import IsOwnerOrReadOnly
+from .renderers import (
+    CSVShoppingListRenderer, PDFShoppingListRenderer,
+    TextShoppingListRenderer,
+)
 from .serializers import (
-    IngredientSerializer, RecipeCreateSerializer, RecipeSerializer,
-    ShortRecipeSerializer, SubscriptionSerializer, TagSerializer,
+    FastRecipeSerializer, IngredientSerializer, RecipeCreateSerializer,
+    RecipeIdsSerializer, RecipeSerializer, ShortRecipeSerializer,
+    SubscriptionSerializer, TagSerializer,
+)
+from .signals import (
+    INGREDIENTS_NAMESPACE, RECIPES_NAMESPACE, SUBSCRIPTIONS_NAMESPACE,
+    TAGS_NAMESPACE, get_author_namespace, get_recipe_flags_namespace,
+    get_recipe_namespace,
 )
 
 User = get_user_model()
 
+SHOPPING_LIST_CHUNK_SIZE = 500
+
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CachedReferenceMixin, viewsets.ReadOnlyModelViewSet):
     """ Viewset for Tag model. """
 
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
+    cache_namespace = TAGS_NAMESPACE
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
-    """ Viewset for Tag model. """
+class IngredientViewSet(CachedReferenceMixin, viewsets.ReadOnlyModelViewSet):
+    """ Viewset for Ingredient model. """
 
     queryset = Ingredient.objects.all()
+    cache_namespace = INGREDIENTS_NAMESPACE
     serializer_class = IngredientSerializer
     filter_backends = (IngredientSearchFilter,)
     search_fields = ('^name',)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(AnonymousResponseCacheMixin, viewsets.ModelViewSet):
     """ Viewset for Recipe model. """
 
     queryset = Recipe.objects.all()
     http_method_names = ['get', 'post', 'patch', 'delete']
     permission_classes = (IsOwnerOrReadOnly,)
-    pagination_class = LimitPageNumberPagination
-    filter_backends = [DjangoFilterBackend]
+    # Image is sent base64 encoded in JSON or as file in multipart data.
+    parser_classes = (JSONParser, MultiPartParser)
+    filter_backends = [DjangoFilterBackend, RecipeOrderingFilter]
     filterset_class = RecipeFilter
+    ordering_fields = ('favorites_count', 'in_carts_count')
+    count_estimate = True
+    response_cache_name = 'recipes'
+    # Order by counters isn't invalidated, it's updated with cache timeout.
+    response_cache_params = (
+        'page', 'limit', 'cursor', 'ordering', 'tags', 'author', 'search',
+        'is_favorited', 'is_in_shopping_cart',
+    )
+
+    def get_response_key_namespaces(self):
+        # Any change of recipes may change list of filtered recipes.
+        if self.action == 'list':
+            return [RECIPES_NAMESPACE]
+        return []
+
+    def get_response_namespaces(self, data):
+        recipes = data['results'] if self.action == 'list' else [data]
+        namespaces = [TAGS_NAMESPACE, INGREDIENTS_NAMESPACE]
+        for recipe in recipes:
+            namespaces.append(get_recipe_namespace(recipe['id']))
+            namespaces.append(get_author_namespace(recipe['author']['id']))
+        return namespaces
+
+    def get_count_cache_namespaces(self):
+        namespaces = [RECIPES_NAMESPACE]
+        if self.request.user.is_authenticated:
+            namespaces.append(get_recipe_flags_namespace(self.request.user))
+        return namespaces
+
+    @property
+    def pagination_class(self):
+        """
+        Keyset pagination is enabled with `cursor` query param,
+        empty value of the param returns the first page.
+        """
+
+        cursor_query_param = LimitCursorPagination.cursor_query_param
+        if cursor_query_param in self.request.query_params:
+            return LimitCursorPagination
+        return LimitPageNumberPagination
+
+    def get_queryset(self):
+        queryset = Recipe.objects.with_related()
+        if self.action == 'list':
+            # Tags and ingredients are loaded by list serializer only for
+            # recipes which are not cached.
+            queryset = Recipe.objects.select_related('author')
+        return queryset.with_user_flags(self.request.user)
 
     def get_serializer_class(self):
         if self.request.method in ['POST', 'PATCH']:
             return RecipeCreateSerializer
+        if settings.RECIPE_FAST_SERIALIZER:
+            return FastRecipeSerializer
         return RecipeSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context[SUBSCRIBED_AUTHORS] = get_subscribed_authors(
+            self.request.user,
+        )
+        return context
+
+    def perform_content_negotiation(self, request, force=False):
+        # Shopping list falls back to text for unknown format or Accept.
+        if self.action == 'download_shopping_cart':
+            force = True
+        return super().perform_content_negotiation(request, force)
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    def _batch(self, request, model):
+        """
+        Add or delete relations of user with list of recipes.
+        Returns status for every recipe id.
+        """
+
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = serializer.validated_data['recipes']
+
+        found = Recipe.objects.only('id').in_bulk(recipe_ids)
+        ids = [recipe_id for recipe_id in recipe_ids if recipe_id in found]
+
+        if request.method == 'POST':
+            changed = model.objects.add_many(request.user, ids)
+            changed_status, unchanged_status = 'added', 'exists'
+        else:
+            changed = model.objects.remove_many(request.user, ids)
+            changed_status, unchanged_status = 'removed', 'missing'
+
+        if changed:
+            bump_version(get_recipe_flags_namespace(request.user))
+
+        results = []
+        for recipe_id in recipe_ids:
+            if recipe_id not in found:
+                result = 'not_found'
+            elif recipe_id in changed:
+                result = changed_status
+            else:
+                result = unchanged_status
+            results.append({'id': recipe_id, 'status': result})
+        return Response({'results': results})
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='favorite/batch',
+        permission_classes=[IsAuthenticated],
+    )
+    def favorite_batch(self, request):
+        """ Add list of recipes in favorites. """
+
+        return self._batch(request, Favorite)
+
+    @favorite_batch.mapping.delete
+    def delete_favorite_batch(self, request):
+        """ Delete list of recipes from favorites. """
+
+        return self._batch(request, Favorite)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='shopping_cart/batch',
+        permission_classes=[IsAuthenticated],
+    )
+    def shopping_cart_batch(self, request):
+        """ Add list of recipes in shopping cart. """
+
+        return self._batch(request, ShoppingCart)
+
+    @shopping_cart_batch.mapping.delete
+    def delete_shopping_cart_batch(self, request):
+        """ Delete list of recipes from shopping cart. """
+
+        return self._batch(request, ShoppingCart)
+
     @action(
         detail=True,
         methods=['post'],
@@ -66,13 +223,13 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         recipe = get_object_or_404(Recipe, pk=pk)
 
-        if Favorite.objects.filter(user=request.user, recipe=recipe).exists():
+        if not Favorite.objects.add(request.user, recipe):
             return Response(
                 {'errors': 'The recipe is already in favorites'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        Favorite.objects.create(user=request.user, recipe=recipe)
+        bump_version(get_recipe_flags_namespace(request.user))
         serializer = ShortRecipeSerializer(
             recipe, context={'request': request},
         )
@@ -82,51 +239,46 @@ class RecipeViewSet(viewsets.ModelViewSet):
     def delete_favorite(self, request, pk):
         """ Delete recipe from favorite. """
 
-        recipe = get_object_or_404(Recipe, pk=pk)
-        favorite = Favorite.objects.filter(user=request.user, recipe=recipe)
-
-        if not favorite:
+        if not Favorite.objects.remove(request.user, pk):
+            get_object_or_404(Recipe.objects.values('pk'), pk=pk)
             return Response(
                 {'error': "The recipe isn't in favorites!"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        favorite.delete()
+        bump_version(get_recipe_flags_namespace(request.user))
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-    def _form_shopping_list(self, cart):
-        need_to_buy = dict()
-
-        for cart_object in cart:
-            ingredient_queryset = cart_object.recipe.ingredients_list.all()
-            for ingredient in ingredient_queryset:
-                if ingredient.ingredient.name not in need_to_buy:
-                    need_to_buy[ingredient.ingredient.name] = {
-                        'measurement_unit':
-                        ingredient.ingredient.measurement_unit,
-                        'amount': 0,
-                    }
-                need_to_buy[ingredient.ingredient.name]['amount'] += (
-                    ingredient.amount
-                )
-
-        return [
-            f"{index}. {name} - {need_to_buy[name]['amount']} "
-            f"{need_to_buy[name]['measurement_unit']}\n"
-            for index, name in enumerate(need_to_buy, 1)
-        ]
-
-    @action(detail=False, permission_classes=[IsAuthenticated])
+    @action(
+        detail=False,
+        permission_classes=[IsAuthenticated],
+        renderer_classes=[
+            TextShoppingListRenderer,
+            CSVShoppingListRenderer,
+            PDFShoppingListRenderer,
+        ],
+    )
     def download_shopping_cart(self, request):
-        """ Download recipes list from shopping cart. """
-
-        cart = ShoppingCart.objects.filter(user=request.user)
-
-        shopping_list = self._form_shopping_list(cart)
-
-        response = HttpResponse(shopping_list, content_type='text/plain')
+        """
+        Download recipes list from shopping cart.
+        Format is chosen with `format` query param: txt, csv or pdf,
+        text is sent for unknown format.
+        """
+
+        renderer = request.accepted_renderer
+        ingredients = IngredientRecipe.objects.shopping_list(
+            request.user,
+        ).iterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE)
+
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+
+        response = StreamingHttpResponse(
+            renderer.stream(ingredients), content_type=content_type,
+        )
         response['Content-Disposition'] = (
-            'attachment; filename=shopping_list.txt'
+            f'attachment; filename=shopping_list.{renderer.format}'
         )
         return response
 
@@ -146,31 +298,34 @@ class SubscribeView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if (
-            Subscription.objects.filter(
-                follower=follower, author=author,
-            ).exists()
-        ):
+        try:
+            with transaction.atomic():
+                subscription = Subscription.objects.create(
+                    follower=follower, author=author,
+                )
+        except IntegrityError:
             return Response(
                 {'errors': 'Subscribtion error. The subscription exists!'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        subscription = Subscription.objects.create(
-            follower=follower, author=author,
-        )
+        bump_version(SUBSCRIPTIONS_NAMESPACE)
+        limit = request.query_params.get('recipes_limit')
+        subscription = Subscription.objects.with_recipes(
+            int(limit) if limit else None,
+        ).get(pk=subscription.pk)
         serializer = SubscriptionSerializer(
             subscription, context={'request': request},
         )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def delete(self, request, user_id):
-        author = get_object_or_404(User, id=user_id)
-        subscription = Subscription.objects.filter(
-            follower=request.user, author=author,
-        )
+        deleted, _ = Subscription.objects.filter(
+            follower=request.user, author_id=user_id,
+        ).delete()
 
-        if not subscription:
+        if not deleted:
+            get_object_or_404(User.objects.values('pk'), id=user_id)
             return Response(
                 {
                     'errors':
@@ -179,7 +334,7 @@ class SubscribeView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        subscription.delete()
+        bump_version(SUBSCRIPTIONS_NAMESPACE)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -192,7 +347,7 @@ class ShoppingCartView(APIView):
         user = request.user
         recipe = get_object_or_404(Recipe, id=recipe_id)
 
-        if (ShoppingCart.objects.filter(user=user, recipe=recipe).exists()):
+        if not ShoppingCart.objects.add(user, recipe):
             return Response(
                 {
                     'errors':
@@ -201,19 +356,15 @@ class ShoppingCartView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        ShoppingCart.objects.create(user=user, recipe=recipe)
+        bump_version(get_recipe_flags_namespace(user))
         serializer = ShortRecipeSerializer(
             recipe, context={'request': request},
         )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def delete(self, request, recipe_id):
-        recipe = get_object_or_404(Recipe, id=recipe_id)
-        cart = ShoppingCart.objects.filter(
-            user=request.user, recipe=recipe,
-        )
-
-        if not cart:
+        if not ShoppingCart.objects.remove(request.user, recipe_id):
+            get_object_or_404(Recipe.objects.values('pk'), id=recipe_id)
             return Response(
                 {
                     'errors':
@@ -222,5 +373,5 @@ class ShoppingCartView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        cart.delete()
+        bump_version(get_recipe_flags_namespace(request.user))
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -36,6 +36,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -68,6 +69,10 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.TokenAuthentication',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'PAGE_SIZE': 6,
 }
 
@@ -91,6 +96,67 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+# Local memory cache is per process, use shared backend with several workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+REFERENCE_CACHE_TIMEOUT = int(os.getenv('REFERENCE_CACHE_TIMEOUT', 300))
+
+# Cached responses for anonymous users.
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 300))
+
+# Present recipes with plain functions instead of DRF serializer fields.
+RECIPE_FAST_SERIALIZER = int(os.getenv('RECIPE_FAST_SERIALIZER', 1))
+
+# Cached user independent presentations of recipes.
+RECIPE_FRAGMENT_CACHE_TIMEOUT = int(
+    os.getenv('RECIPE_FRAGMENT_CACHE_TIMEOUT', 3600)
+)
+
+# Cached count of objects for paginated lists.
+PAGINATION_COUNT_TIMEOUT = int(os.getenv('PAGINATION_COUNT_TIMEOUT', 60))
+
+# Estimated count from PostgreSQL statistics for unfiltered big lists.
+PAGINATION_COUNT_ESTIMATE = int(os.getenv('PAGINATION_COUNT_ESTIMATE', 0))
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = int(
+    os.getenv('PAGINATION_COUNT_ESTIMATE_THRESHOLD', 100000)
+)
+
+# Search ingredients by name prefix in memory instead of database.
+INGREDIENT_PREFIX_INDEX = int(os.getenv('INGREDIENT_PREFIX_INDEX', 1))
+
+# Renditions of recipe images are generated by background worker pool,
+# set IMAGE_RENDITIONS_SYNC to generate them in request thread.
+IMAGE_RENDITIONS_WORKERS = int(os.getenv('IMAGE_RENDITIONS_WORKERS', 2))
+IMAGE_RENDITIONS_SYNC = int(os.getenv('IMAGE_RENDITIONS_SYNC', 0))
+
+# Limits of uploaded recipe images.
+RECIPE_IMAGE_MAX_BYTES = int(
+    os.getenv('RECIPE_IMAGE_MAX_BYTES', 20 * 1024 * 1024)
+)
+RECIPE_IMAGE_MAX_PIXELS = int(os.getenv('RECIPE_IMAGE_MAX_PIXELS', 40000000))
+
+# Compression of responses, brotli is used if the package is installed.
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+
+# TrueType font embedded in PDF shopping lists. If the file is missing,
+# standard Helvetica font is used, some viewers show no Cyrillic with it.
+SHOPPING_LIST_PDF_FONT = os.getenv(
+    'SHOPPING_LIST_PDF_FONT', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+)
+
 CSRF_TRUSTED_ORIGINS = ['http://localhost', 'http://130.193.41.201']
 
 # Password validation
@@ -49,15 +49,49 @@ class RecipeAdmin(admin.ModelAdmin):
         'image',
         'name',
         'text',
-        'cooking_time'
+        'cooking_time',
+        'favorites_count',
+        'in_carts_count',
     )
 
 
-@admin.register(Favorite)
-class FavoriteAdmin(admin.ModelAdmin):
+class RecipeCounterAdmin(admin.ModelAdmin):
+    """
+    Admin for relations of users with recipes which recounts counter
+    fields of changed recipes.
+    """
+
     list_display = ('pk', 'user', 'recipe')
 
+    def _recount(self, recipe_ids):
+        Recipe.objects.filter(pk__in=recipe_ids).recount(self.model)
+
+    def save_model(self, request, obj, form, change):
+        recipe_ids = {obj.recipe_id}
+        if change:
+            recipe_ids.update(
+                self.model.objects.filter(pk=obj.pk).values_list(
+                    'recipe_id', flat=True,
+                )
+            )
+        super().save_model(request, obj, form, change)
+        self._recount(recipe_ids)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self._recount([obj.recipe_id])
+
+    def delete_queryset(self, request, queryset):
+        recipe_ids = set(queryset.values_list('recipe_id', flat=True))
+        super().delete_queryset(request, queryset)
+        self._recount(recipe_ids)
+
+
+@admin.register(Favorite)
+class FavoriteAdmin(RecipeCounterAdmin):
+    pass
+
 
 @admin.register(ShoppingCart)
-class ShoppingCartAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'user', 'recipe')
+class ShoppingCartAdmin(RecipeCounterAdmin):
+    pass
@@ -0,0 +1,69 @@
+import os
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from recipes.models import Recipe
+from recipes.renditions import UPLOAD_TO, get_storage
+
+
+def get_image_references():
+    """ Count references of recipes to image and rendition files. """
+
+    references = Counter()
+    for image, renditions in Recipe.objects.values_list(
+        'image', 'image_renditions',
+    ).iterator():
+        references[image] += 1
+        for files in renditions.values():
+            references.update(files.values())
+    return references
+
+
+class Command(BaseCommand):
+    help = 'Delete recipe image files which are not used by recipes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=3600,
+            help=(
+                'Keep files modified in last seconds, they may be used '
+                'by not committed transactions or being generated.'
+            ),
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only list files which would be deleted.',
+        )
+
+    def handle(self, *args, **options):
+        storage = get_storage()
+        references = get_image_references()
+        deadline = timezone.now() - timedelta(seconds=options['grace'])
+
+        deleted = 0
+        files = []
+        if storage.exists(UPLOAD_TO):
+            _, files = storage.listdir(UPLOAD_TO)
+        for filename in files:
+            name = os.path.join(UPLOAD_TO, filename)
+            if references[name] or storage.get_modified_time(name) > deadline:
+                continue
+            if options['dry_run']:
+                self.stdout.write(name)
+            else:
+                storage.delete(name)
+            deleted += 1
+
+        action = 'would be deleted' if options['dry_run'] else 'are deleted'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{deleted} of {len(files)} files {action}, '
+                f'{len(references)} files are used by recipes'
+            )
+        )
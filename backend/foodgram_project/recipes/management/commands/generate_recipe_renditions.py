@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe
+from recipes.renditions import generate_renditions
+
+
+class Command(BaseCommand):
+    help = 'Generate renditions of recipe images which have no renditions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Regenerate renditions of all recipes.',
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.order_by('id')
+        if not options['all']:
+            recipes = recipes.filter(image_renditions={})
+
+        generated = 0
+        for recipe_id, image in recipes.values_list('id', 'image').iterator():
+            try:
+                generate_renditions(recipe_id, image)
+            except Exception as error:
+                self.stderr.write(f'Recipe {recipe_id}: {error}')
+            else:
+                generated += 1
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Renditions of {generated} recipes are generated'
+            )
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import Favorite, Recipe, ShoppingCart
+
+
+class Command(BaseCommand):
+    help = 'Recount favorites and shopping carts counters of recipes.'
+
+    def handle(self, *args, **options):
+        updated = Recipe.objects.recount(Favorite, ShoppingCart)
+        self.stdout.write(
+            self.style.SUCCESS(f'Counters of {updated} recipes are recounted')
+        )
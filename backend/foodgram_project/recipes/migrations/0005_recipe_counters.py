@@ -0,0 +1,52 @@
+# Generated by Django 4.0 on 2026-10-18 20:21
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount_counters(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+
+    def count_subquery(model_name):
+        return Coalesce(
+            Subquery(
+                apps.get_model('recipes', model_name).objects.filter(
+                    recipe=OuterRef('pk'),
+                ).order_by().values('recipe').annotate(
+                    count=Count('id'),
+                ).values('count'),
+                output_field=IntegerField(),
+            ),
+            0,
+        )
+
+    Recipe.objects.update(
+        favorites_count=count_subquery('Favorite'),
+        in_carts_count=count_subquery('ShoppingCart'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Favorites count'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='in_carts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Shopping carts count'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-favorites_count', '-id'], name='recipe_favorites_count_idx'),
+        ),
+        migrations.RunPython(recount_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.0 on 2026-10-18 20:30
+
+from django.db import migrations, models
+import recipes.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_recipe_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(storage=recipes.storage.ContentAddressedStorage, upload_to='recipes_photo/', verbose_name='Image'),
+        ),
+    ]
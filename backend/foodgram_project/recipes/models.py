@@ -1,9 +1,21 @@
 from colorfield.fields import ColorField
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVectorField,
+)
+from django.db import IntegrityError, connections, models, transaction
+from django.db.models import (
+    BooleanField, Count, Exists, F, IntegerField, OuterRef, Prefetch, Q,
+    Subquery, Sum, Value,
+)
+from django.db.models.functions import Coalesce
+
+from .storage import ContentAddressedStorage
 
 User = get_user_model()
 
+SEARCH_CONFIG = 'russian'
+
 
 class Tag(models.Model):
     """ Model for tags. """
@@ -38,6 +50,38 @@ class Ingredient(models.Model):
         return self.name
 
 
+class SubscriptionQuerySet(models.QuerySet):
+    """ QuerySet with loading of data for subscription presentation. """
+
+    def with_recipes(self, recipes_limit=None):
+        """
+        Load authors with their recipes count and last recipes.
+        Recipes are limited per author with a correlated subquery,
+        so amount of queries doesn't depend on amount of authors.
+        """
+
+        recipes = Recipe.objects.order_by('-id')
+        if recipes_limit is not None:
+            recipes = recipes.filter(
+                id__in=Subquery(
+                    Recipe.objects.filter(
+                        author=OuterRef('author'),
+                    ).order_by('-id').values('id')[:recipes_limit]
+                ),
+            )
+
+        # Meta.ordering isn't applied to aggregation with GROUP BY.
+        return self.select_related('author').annotate(
+            recipes_count=Count('author__recipes'),
+        ).order_by('-id').prefetch_related(
+            Prefetch(
+                'author__recipes',
+                queryset=recipes,
+                to_attr='limited_recipes',
+            ),
+        )
+
+
 class Subscription(models.Model):
     """ Model for subscibtions. """
 
@@ -54,6 +98,8 @@ class Subscription(models.Model):
         verbose_name='Following',
     )
 
+    objects = SubscriptionQuerySet.as_manager()
+
     class Meta:
         ordering = ['-id']
         constraints = [
@@ -64,6 +110,91 @@ class Subscription(models.Model):
         ]
 
 
+def get_recipe_prefetches():
+    """ Prefetches of tags and ingredients for recipe presentation. """
+
+    return (
+        Prefetch('tags', queryset=Tag.objects.all()),
+        Prefetch(
+            'ingredients_list',
+            queryset=IngredientRecipe.objects.select_related('ingredient'),
+        ),
+    )
+
+
+class RecipeQuerySet(models.QuerySet):
+    """ QuerySet with loading of data for recipe presentation. """
+
+    def with_related(self):
+        """ Load author, tags and ingredients in constant queries. """
+
+        return self.select_related('author').prefetch_related(
+            *get_recipe_prefetches()
+        )
+
+    def with_user_flags(self, user):
+        """ Annotate is_favorited and is_in_shopping_cart for user. """
+
+        if not user.is_authenticated:
+            return self.annotate(
+                is_favorited=Value(False, output_field=BooleanField()),
+                is_in_shopping_cart=Value(False, output_field=BooleanField()),
+            )
+
+        return self.annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef('pk'))
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingCart.objects.filter(user=user, recipe=OuterRef('pk'))
+            ),
+        )
+
+    def increment(self, field, delta=1):
+        """ Atomically change counter field of recipes in database. """
+
+        return self.update(**{field: F(field) + delta})
+
+    def recount(self, *models):
+        """
+        Recount counter fields of recipes from relations tables.
+        Every model defines `recipe_counter` field which is recounted.
+        """
+
+        return self.update(**{
+            model.recipe_counter: Coalesce(
+                Subquery(
+                    model.objects.filter(
+                        recipe=OuterRef('pk'),
+                    ).order_by().values('recipe').annotate(
+                        count=Count('id'),
+                    ).values('count'),
+                    output_field=IntegerField(),
+                ),
+                0,
+            )
+            for model in models
+        })
+
+    def search(self, query):
+        """
+        Full-text search by name and text ordered by rank on PostgreSQL,
+        substring search on other databases.
+        """
+
+        if connections[self.db].vendor != 'postgresql':
+            return self.filter(
+                Q(name__icontains=query) | Q(text__icontains=query)
+            )
+
+        search_query = SearchQuery(
+            query, config=SEARCH_CONFIG, search_type='websearch',
+        )
+        return self.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query),
+        ).order_by('-rank', '-id')
+
+
 class Recipe(models.Model):
     """ Model for recipies. """
 
@@ -87,18 +218,56 @@ class Recipe(models.Model):
         related_name='recipes',
         verbose_name='Ingredients',
     )
-    image = models.ImageField('Image', upload_to='recipes_photo/')
+    image = models.ImageField(
+        'Image', upload_to='recipes_photo/', storage=ContentAddressedStorage,
+    )
     name = models.CharField('Name', max_length=200)
     text = models.TextField('Description')
     cooking_time = models.PositiveIntegerField('Duration of cooking')
+    # Maintained by database trigger on PostgreSQL, see migration 0003.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Map of size to rendition files by format, see recipes.renditions.
+    image_renditions = models.JSONField(
+        'Image renditions', default=dict, blank=True, editable=False,
+    )
+    # Maintained by views, recount with recount_recipe_counters command.
+    favorites_count = models.PositiveIntegerField(
+        'Favorites count', default=0, editable=False,
+    )
+    in_carts_count = models.PositiveIntegerField(
+        'Shopping carts count', default=0, editable=False,
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         ordering = ['-id']
+        indexes = [
+            models.Index(
+                fields=['author', '-id'], name='recipe_author_id_idx',
+            ),
+            models.Index(
+                fields=['-favorites_count', '-id'],
+                name='recipe_favorites_count_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class IngredientRecipeQuerySet(models.QuerySet):
+    """ QuerySet for ingredients of recipes. """
+
+    def shopping_list(self, user):
+        """ Sum amounts of ingredients for recipes in user shopping cart. """
+
+        return self.filter(recipe__shoping_list__user=user).values(
+            name=F('ingredient__name'),
+            measurement_unit=F('ingredient__measurement_unit'),
+        ).annotate(amount=Sum('amount')).order_by('name', 'measurement_unit')
+
+
 class IngredientRecipe(models.Model):
     """
     Model for many to many realization between Recipe and Ingredient models.
@@ -116,6 +285,8 @@ class IngredientRecipe(models.Model):
     )
     amount = models.PositiveSmallIntegerField()
 
+    objects = IngredientRecipeQuerySet.as_manager()
+
     class Meta:
         ordering = ['-id']
         constraints = [
@@ -137,6 +308,145 @@ class TagRecipe(models.Model):
     recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE)
     tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['tag', 'recipe'], name='tagrecipe_tag_recipe_idx',
+            ),
+        ]
+
+
+class UserRecipeQuerySet(models.QuerySet):
+    """
+    QuerySet for relations between users and recipes.
+    Model defines `recipe_counter` field of Recipe which is changed
+    with relations.
+    """
+
+    def add(self, user, recipe):
+        """
+        Create relation with single INSERT.
+        Returns False if the relation already exists.
+        """
+
+        try:
+            with transaction.atomic(using=self.db):
+                self.create(user=user, recipe=recipe)
+                Recipe.objects.filter(pk=recipe.pk).increment(
+                    self.model.recipe_counter,
+                )
+        except IntegrityError:
+            return False
+        return True
+
+    def remove(self, user, recipe_id):
+        """
+        Delete relation with single DELETE.
+        Returns False if the relation doesn't exist.
+        Counter is recounted, so it can't become negative if it missed
+        the relation.
+        """
+
+        with transaction.atomic(using=self.db):
+            deleted, _ = self.filter(user=user, recipe_id=recipe_id).delete()
+            if deleted:
+                Recipe.objects.filter(pk=recipe_id).recount(self.model)
+        return bool(deleted)
+
+    def _can_return_rows(self):
+        """ Whether database returns rows changed by INSERT and DELETE. """
+
+        connection = connections[self.db]
+        if connection.vendor == 'postgresql':
+            return True
+        return (
+            connection.vendor == 'sqlite'
+            and connection.Database.sqlite_version_info >= (3, 35)
+        )
+
+    def _execute_returning_recipes(self, sql, params):
+        """ Execute SQL with RETURNING recipe column, returns ids. """
+
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            return {recipe_id for recipe_id, in cursor.fetchall()}
+
+    def _get_columns(self):
+        quote_name = connections[self.db].ops.quote_name
+        opts = self.model._meta
+        return (
+            quote_name(opts.db_table),
+            quote_name(opts.get_field('user').column),
+            quote_name(opts.get_field('recipe').column),
+        )
+
+    def add_many(self, user, recipe_ids):
+        """
+        Create relations with recipes.
+        Returns ids of recipes which were added by this call, they are
+        taken from INSERT, so concurrent calls can't add the same id.
+        Counters are recounted, so concurrent writes can't skew them.
+        """
+
+        with transaction.atomic(using=self.db):
+            if not recipe_ids:
+                added = set()
+            elif self._can_return_rows():
+                table, user_column, recipe_column = self._get_columns()
+                added = self._execute_returning_recipes(
+                    f'INSERT INTO {table} ({user_column}, {recipe_column}) '
+                    f'VALUES {", ".join(["(%s, %s)"] * len(recipe_ids))} '
+                    f'ON CONFLICT DO NOTHING RETURNING {recipe_column}',
+                    [
+                        value for recipe_id in recipe_ids
+                        for value in (user.pk, recipe_id)
+                    ],
+                )
+            else:
+                added = {
+                    recipe_id for recipe_id in recipe_ids
+                    if self._create(user, recipe_id)
+                }
+            if added:
+                Recipe.objects.filter(pk__in=added).recount(self.model)
+        return added
+
+    def _create(self, user, recipe_id):
+        try:
+            with transaction.atomic(using=self.db):
+                self.create(user=user, recipe_id=recipe_id)
+        except IntegrityError:
+            return False
+        return True
+
+    def remove_many(self, user, recipe_ids):
+        """
+        Delete relations with recipes.
+        Returns ids of recipes which were removed by this call, they are
+        taken from DELETE, so concurrent calls can't remove the same id.
+        """
+
+        with transaction.atomic(using=self.db):
+            if not recipe_ids:
+                removed = set()
+            elif self._can_return_rows():
+                table, user_column, recipe_column = self._get_columns()
+                removed = self._execute_returning_recipes(
+                    f'DELETE FROM {table} WHERE {user_column} = %s '
+                    f'AND {recipe_column} IN '
+                    f'({", ".join(["%s"] * len(recipe_ids))}) '
+                    f'RETURNING {recipe_column}',
+                    [user.pk, *recipe_ids],
+                )
+            else:
+                removed = {
+                    recipe_id for recipe_id in recipe_ids
+                    if self.filter(user=user, recipe_id=recipe_id).delete()[0]
+                }
+            if removed:
+                Recipe.objects.filter(pk__in=removed).recount(self.model)
+        return removed
+
 
 class Favorite(models.Model):
     """ Model for favorite recipes. """
@@ -154,6 +464,9 @@ class Favorite(models.Model):
         verbose_name='Recipe',
     )
 
+    objects = UserRecipeQuerySet.as_manager()
+    recipe_counter = 'favorites_count'
+
     class Meta:
         ordering = ['-id']
         constraints = [
@@ -162,9 +475,14 @@ class Favorite(models.Model):
                 name='unique_favorite',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['user', '-id'], name='favorite_user_id_idx',
+            ),
+        ]
 
     def __str__(self):
-        return self.recipe
+        return str(self.recipe)
 
 
 class ShoppingCart(models.Model):
@@ -183,6 +501,9 @@ class ShoppingCart(models.Model):
         verbose_name='Recipe'
     )
 
+    objects = UserRecipeQuerySet.as_manager()
+    recipe_counter = 'in_carts_count'
+
     class Meta:
         ordering = ['-id']
         constraints = [
@@ -191,3 +512,8 @@ class ShoppingCart(models.Model):
                 name='unique_shopping_cart',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['user', '-id'], name='shoppingcart_user_id_idx',
+            ),
+        ]
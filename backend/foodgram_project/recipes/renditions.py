@@ -0,0 +1,132 @@
+"""
+Renditions of recipe images.
+
+Uploaded image is decoded once and downscaled to every size in WebP and
+JPEG formats. Files are stored in content addressed storage of recipe
+images, so they can be cached by clients forever. Renditions are
+generated in a background worker pool after the transaction which saved
+the image is committed.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+from .models import Recipe
+
+logger = logging.getLogger(__name__)
+
+# Sent with `recipe_id` argument when renditions of the image are saved.
+renditions_generated = Signal()
+
+UPLOAD_TO = 'recipes_photo'
+
+# Sizes are ordered from the largest, so every size is made from previous.
+RENDITIONS = (
+    ('full', 1280),
+    ('card', 640),
+    ('thumbnail', 240),
+)
+FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpeg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+
+def get_storage():
+    return Recipe._meta.get_field('image').storage
+
+
+@lru_cache(maxsize=None)
+def _get_executor():
+    return ThreadPoolExecutor(
+        max_workers=settings.IMAGE_RENDITIONS_WORKERS,
+        thread_name_prefix='renditions',
+    )
+
+
+def _save(image, extension, image_format, options):
+    """ Encode image and save it in storage of recipe images. """
+
+    buffer = BytesIO()
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    image.save(buffer, image_format, **options)
+    return get_storage().save(
+        os.path.join(UPLOAD_TO, f'rendition.{extension}'),
+        ContentFile(buffer.getvalue()),
+    )
+
+
+def make_renditions(image_file):
+    """ Returns map of size to names of rendition files by format. """
+
+    with Image.open(image_file) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert(
+            'RGBA' if 'A' in image.getbands() else 'RGB',
+        )
+
+    renditions = {}
+    for size, max_side in RENDITIONS:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        renditions[size] = {
+            extension: _save(image, extension, image_format, options)
+            for extension, image_format, options in FORMATS
+        }
+    return renditions
+
+
+def generate_renditions(recipe_id, image_name):
+    """
+    Generate renditions of recipe image.
+    Renditions are not saved if the image was changed meanwhile.
+    """
+
+    with get_storage().open(image_name) as image_file:
+        renditions = make_renditions(image_file)
+    updated = Recipe.objects.filter(pk=recipe_id, image=image_name).update(
+        image_renditions=renditions,
+    )
+    if updated:
+        renditions_generated.send(sender=Recipe, recipe_id=recipe_id)
+
+
+def _generate_in_worker(recipe_id, image_name):
+    close_old_connections()
+    try:
+        generate_renditions(recipe_id, image_name)
+    except Exception:
+        logger.exception(
+            'Renditions of image %s of recipe %s are not generated',
+            image_name,
+            recipe_id,
+        )
+    finally:
+        close_old_connections()
+
+
+def schedule_renditions(recipe):
+    """
+    Generate renditions of recipe image in worker pool after transaction
+    commit, or immediately with IMAGE_RENDITIONS_SYNC setting.
+    """
+
+    args = (recipe.pk, recipe.image.name)
+    if settings.IMAGE_RENDITIONS_SYNC:
+        generate_renditions(*args)
+        return
+
+    transaction.on_commit(
+        lambda: _get_executor().submit(_generate_in_worker, *args)
+    )
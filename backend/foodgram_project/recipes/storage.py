@@ -0,0 +1,37 @@
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+
+# Length of content hash in file names.
+DIGEST_LENGTH = 32
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Storage which names files by hash of their content, so every unique
+    file is stored once and its url can be cached forever.
+    Files are shared by recipes, orphans are removed by
+    collect_recipe_images command.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        name = os.path.join(
+            directory, digest.hexdigest()[:DIGEST_LENGTH] + extension,
+        )
+        try:
+            # Reused file is not collected as old orphan until the recipe
+            # which uses it is committed.
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return super().save(name, content, max_length)
+        return name
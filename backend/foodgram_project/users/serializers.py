@@ -8,6 +8,35 @@ from recipes.models import Subscription
 
 User = get_user_model()
 
+SUBSCRIBED_AUTHORS = 'subscribed_authors'
+
+
+def get_subscribed_authors(user):
+    """ Get set of ids of authors followed by user in single query. """
+
+    if not user.is_authenticated:
+        return set()
+    return set(
+        Subscription.objects.filter(
+            follower=user,
+        ).values_list('author_id', flat=True)
+    )
+
+
+def is_subscribed(author, context):
+    """
+    Check subscription of request user on author, set of subscribed
+    authors from context is used if it is loaded.
+    """
+
+    subscribed_authors = context.get(SUBSCRIBED_AUTHORS)
+    if subscribed_authors is not None:
+        return author.id in subscribed_authors
+    return Subscription.objects.filter(
+        follower=context.get('request').user.id,
+        author=author,
+    ).exists()
+
 
 class CreateUserSerializer(serializers.ModelSerializer):
     """ Serializer for registration new users. """
@@ -52,10 +81,7 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
     def get_is_subscribed(self, obj):
-        return Subscription.objects.filter(
-            follower=self.context.get('request').user.id,
-            author=obj,
-        ).exists()
+        return is_subscribed(obj, self.context)
 
 
 class TokenCreateByEmailSerializer(TokenCreateSerializer):
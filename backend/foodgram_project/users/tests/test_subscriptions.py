@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from recipes.models import Recipe, Subscription
+from .errors import TestErrors
+
+User = get_user_model()
+
+
+class SubscriptionsPresentation(APITestCase):
+    """ Tests for checking list of subscriptions. """
+
+    AUTHORS_AMOUNT = 4
+    RECIPES_AMOUNT = 3
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.user = User.objects.create(
+            email='test_user1@user.ru',
+            username='test_user1',
+            first_name='user1',
+            last_name='test1',
+        )
+
+        for index in range(cls.AUTHORS_AMOUNT):
+            author = User.objects.create(
+                email=f'author{index}@user.ru',
+                username=f'author{index}',
+                first_name=f'author{index}',
+                last_name='test',
+            )
+            Subscription.objects.create(follower=cls.user, author=author)
+            for recipe_index in range(index):
+                Recipe.objects.create(
+                    author=author,
+                    name=f'Recipe {recipe_index}',
+                    text='Test text',
+                    image='recipes_photo/test.png',
+                    cooking_time=10,
+                )
+
+        cls.authenticated_user = APIClient()
+        cls.authenticated_user.force_authenticate(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def _get_subscriptions(self, params):
+        response = self.authenticated_user.get(
+            reverse('user-subscriptions'), params,
+        )
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_200_OK,
+            TestErrors.INVALID_STATUS_CODE,
+        )
+        return response.json()['results']
+
+    def test_subscriptions_data(self):
+        """ Getting recipes and recipes count of authors. """
+
+        for author in self._get_subscriptions({'recipes_limit': 2}):
+            recipes = Recipe.objects.filter(author=author['id'])
+
+            self.assertTrue(
+                author['is_subscribed'], TestErrors.INVALID_RESPONSE_DATA,
+            )
+            self.assertEqual(
+                author['recipes_count'],
+                recipes.count(),
+                TestErrors.INVALID_RESPONSE_DATA,
+            )
+            self.assertEqual(
+                [recipe['id'] for recipe in author['recipes']],
+                list(recipes.values_list('id', flat=True)[:2]),
+                TestErrors.INVALID_RESPONSE_DATA,
+            )
+
+    def test_subscriptions_without_recipes_limit(self):
+        """ Getting all recipes of authors without limit. """
+
+        for author in self._get_subscriptions({}):
+            self.assertEqual(
+                len(author['recipes']),
+                author['recipes_count'],
+                TestErrors.INVALID_RESPONSE_DATA,
+            )
+
+    def test_subscriptions_order(self):
+        """ Newest subscriptions are the first. """
+
+        self.assertEqual(
+            [
+                author['id']
+                for author in self._get_subscriptions({'limit': 10})
+            ],
+            list(
+                Subscription.objects.filter(
+                    follower=self.user,
+                ).order_by('-id').values_list('author', flat=True)
+            ),
+            TestErrors.INVALID_RESPONSE_DATA,
+        )
+
+    def test_subscriptions_queries(self):
+        """ Amount of queries doesn't depend on amount of authors. """
+
+        for limit in (1, self.AUTHORS_AMOUNT):
+            cache.clear()
+            with self.assertNumQueries(3):
+                self._get_subscriptions({'limit': limit, 'recipes_limit': 1})
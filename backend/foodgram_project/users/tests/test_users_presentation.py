@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import (
@@ -30,6 +31,9 @@ class UsersPresentation(APITestCase):
         cls.authenticated_user = APIClient()
         cls.authenticated_user.force_authenticate(user=cls.user)
 
+    def setUp(self):
+        cache.clear()
+
     def test_get_list_users(self):
         """ Getting list of users. """
 
@@ -60,6 +64,22 @@ class UsersPresentation(APITestCase):
             TestErrors.INAVLID_USER_DATA,
         )
 
+    def test_list_users_queries(self):
+        """ Getting is_subscribed for list of users in single query. """
+
+        for index in range(3):
+            User.objects.create(
+                email=f'test_user_{index}@user.ru',
+                username=f'test_user_{index}',
+            )
+
+        for limit in (1, 4):
+            cache.clear()
+            with self.assertNumQueries(3):
+                self.authenticated_user.get(
+                    reverse('user-list'), {'limit': limit},
+                )
+
     def test_single_user(self):
         """ Getting single user. """
 
@@ -10,9 +10,10 @@ from rest_framework.response import Response
 
 from api.pagination import LimitPageNumberPagination
 from api.serializers import SubscriptionSerializer
+from api.signals import SUBSCRIPTIONS_NAMESPACE, USERS_NAMESPACE
 from .serializers import (
-    CreateUserSerializer, TokenCreateByEmailSerializer,
-    PasswordSerializer, UserSerializer,
+    SUBSCRIBED_AUTHORS, CreateUserSerializer, TokenCreateByEmailSerializer,
+    PasswordSerializer, UserSerializer, get_subscribed_authors,
 )
 
 User = get_user_model()
@@ -40,6 +41,22 @@ class UserViewSet(CreateRetrieveListViewSet):
             return CreateUserSerializer
         return UserSerializer
 
+    @property
+    def count_estimate(self):
+        return self.action == 'list'
+
+    def get_count_cache_namespaces(self):
+        if self.action == 'subscriptions':
+            return [SUBSCRIPTIONS_NAMESPACE]
+        return [USERS_NAMESPACE]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context[SUBSCRIBED_AUTHORS] = get_subscribed_authors(
+            self.request.user,
+        )
+        return context
+
     def perform_create(self, serializer):
         new_user = serializer.save()
         new_user.set_password(serializer.validated_data.get('password'))
@@ -79,7 +96,10 @@ class UserViewSet(CreateRetrieveListViewSet):
     def subscriptions(self, request):
         """ Show all users in subscription. """
 
-        subscriptions = Subscription.objects.filter(follower=request.user)
+        limit = request.query_params.get('recipes_limit')
+        subscriptions = Subscription.objects.filter(
+            follower=request.user,
+        ).with_recipes(int(limit) if limit else None)
         pages = self.paginate_queryset(subscriptions)
         serializer = SubscriptionSerializer(
             pages,
@@ -0,0 +1,11 @@
+#!/bin/sh
+# Precompress API docs for nginx gzip_static, runs on nginx container start.
+set -e
+
+for file in /usr/share/nginx/html/api/docs/*.html \
+            /usr/share/nginx/html/api/docs/*.yml; do
+    [ -f "$file" ] || continue
+    if [ ! -f "$file.gz" ] || [ "$file" -nt "$file.gz" ]; then
+        gzip -9 -c "$file" > "$file.gz"
+    fi
+done